@@ -2,6 +2,9 @@ import unittest
 import pygame
 import sys
 
+from codemetrics import cache_dir_from_env, file_metrics
+from throughput import print_throughput
+
 
 try:
     from tetris_gemini import Tetris, Tetromino, SHAPES, BOARD_WIDTH, BOARD_HEIGHT
@@ -13,27 +16,16 @@ except ImportError:
 def calculate_metrics(filename):
     print(f"\n[{filename}] ANALISIS METRIK KODE:")
     try:
-        with open(filename, 'r') as f:
-            lines = f.readlines()
+        metrics = file_metrics(filename, cache_dir_from_env())
     except FileNotFoundError:
         print(f"File {filename} tidak ditemukan.")
         return
 
-    total_lines = len(lines)
-    empty_lines = 0
-    comment_lines = 0
-    functional_lines = 0
-
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            empty_lines += 1
-        elif stripped.startswith('#'):
-            comment_lines += 1
-        else:
-            functional_lines += 1
-
-    lpe = (functional_lines / total_lines) * 100 if total_lines > 0 else 0
+    total_lines = metrics['total_lines']
+    functional_lines = metrics['functional_lines']
+    empty_lines = metrics['empty_lines']
+    comment_lines = metrics['comment_lines']
+    lpe = metrics['lpe']
     
     print(f"  - Total Lines of Code (LOC) : {total_lines}")
     print(f"  - Functional Lines          : {functional_lines}")
@@ -146,6 +138,7 @@ class TestTetrisGemini(unittest.TestCase):
 
 if __name__ == '__main__':
     calculate_metrics('tetris_gemini.py')
+    print_throughput('gemini')
     print("\n[UNIT TEST EXECUTION]")
     suite = unittest.TestLoader().loadTestsFromTestCase(TestTetrisGemini)
     unittest.TextTestRunner(verbosity=2).run(suite)
\ No newline at end of file
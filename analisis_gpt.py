@@ -3,6 +3,9 @@ import pygame
 import sys
 import os
 
+from codemetrics import cache_dir_from_env, file_metrics
+from throughput import print_throughput
+
 
 try:
 
@@ -18,28 +21,16 @@ def calculate_metrics(filename):
     print(f"[{filename}] ANALISIS METRIK KODE (GPT-5 PRO)")
     print("="*50)
     try:
-
-        with open(filename, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        metrics = file_metrics(filename, cache_dir_from_env())
     except FileNotFoundError:
         print(f"File {filename} tidak ditemukan.")
         return
 
-    total_lines = len(lines)
-    empty_lines = 0
-    comment_lines = 0
-    functional_lines = 0
-
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            empty_lines += 1
-        elif stripped.startswith('#'):
-            comment_lines += 1
-        else:
-            functional_lines += 1
-
-    lpe = (functional_lines / total_lines) * 100 if total_lines > 0 else 0
+    total_lines = metrics['total_lines']
+    functional_lines = metrics['functional_lines']
+    empty_lines = metrics['empty_lines']
+    comment_lines = metrics['comment_lines']
+    lpe = metrics['lpe']
     
     print(f"  - Total Lines of Code (LOC) : {total_lines}")
     print(f"  - Functional Lines          : {functional_lines}")
@@ -211,4 +202,5 @@ if __name__ == '__main__':
     result = unittest.TextTestRunner(verbosity=2).run(suite)
 
 
-    calculate_metrics('tetris_gpt.py')
\ No newline at end of file
+    calculate_metrics('tetris_gpt.py')
+    print_throughput('gpt')
\ No newline at end of file
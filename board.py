@@ -0,0 +1,241 @@
+# ----------------------------
+# Compact palette-indexed board
+# ----------------------------
+# The settled blocks of a width x height board as one bytearray of palette
+# indices (0 is empty). Logical row y lives at cells[offsets[y]:offsets[y] +
+# width]; clearing lines zeroes the full rows in place and moves their offsets
+# to the top of the table, so the rows above drop without any row being
+# reallocated or copied.
+#
+# Indexing reads like the list of lists it replaces: board[y] is a writable
+# view of row y, board[y][x] = v writes one cell, board[a:b] gives a list of
+# row views, and boards compare equal to each other or to lists of rows.
+# Values written are palette indices or palette colours. Every write keeps
+# the per-row fill counts and per-column heights current, so engines can
+# trust them whoever wrote the cells.
+
+
+class Row:
+    """Writable view of logical row y of a board."""
+
+    __slots__ = ('board', 'y')
+
+    def __init__(self, board, y):
+        self.board = board
+        self.y = y
+
+    def _values(self):
+        b = self.board
+        o = b.offsets[self.y]
+        return list(b.cells[o:o + b.width])
+
+    def __len__(self):
+        return self.board.width
+
+    def __getitem__(self, x):
+        if isinstance(x, slice):
+            return self._values()[x]
+        b = self.board
+        if x < 0:
+            x += b.width
+        if not 0 <= x < b.width:
+            raise IndexError("board column out of range")
+        return b.cells[b.offsets[self.y] + x]
+
+    def __setitem__(self, x, value):
+        if isinstance(x, slice):
+            values = self._values()
+            values[x] = value
+            self.board[self.y] = values
+            return
+        b = self.board
+        if x < 0:
+            x += b.width
+        if not 0 <= x < b.width:
+            raise IndexError("board column out of range")
+        b.set_cell(x, self.y, value)
+
+    def __iter__(self):
+        return iter(self._values())
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            other = other._values()
+        return self._values() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._values())
+
+
+class Board:
+    def __init__(self, width, height, palette):
+        self.width = width
+        self.height = height
+        self.palette = palette
+        self.color_ids = {color: i for i, color in enumerate(palette)}
+        self.cells = bytearray(width * height)
+        self.offsets = [y * width for y in range(height)]
+        self.fill = [0] * height      # blocks per logical row
+        self.heights = [0] * width    # height of each column's top block
+
+    # ---- list-of-rows interface ----
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y):
+        if isinstance(y, slice):
+            return [Row(self, i) for i in range(*y.indices(self.height))]
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError("board row out of range")
+        return Row(self, y)
+
+    def __setitem__(self, y, row):
+        if isinstance(y, slice):
+            ys = range(*y.indices(self.height))
+            rows = list(row)
+            if len(rows) != len(ys):
+                raise ValueError(f"expected {len(ys)} rows, got {len(rows)}")
+            for i, r in zip(ys, rows):
+                self[i] = r
+            return
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError("board row out of range")
+        try:
+            values = bytes(row)  # fast path: a row of small ints
+        except (TypeError, ValueError):
+            values = None
+        if values is None or (values and max(values) >= len(self.palette)):
+            values = bytes(self.index(c) for c in row)
+        if len(values) != self.width:
+            raise ValueError(f"board rows have {self.width} cells, got {len(values)}")
+        o = self.offsets[y]
+        self.cells[o:o + self.width] = values
+        self.fill[y] = self.width - values.count(0)
+        h = self.height - y
+        heights = self.heights
+        for x, c in enumerate(values):
+            if c:
+                if h > heights[x]:
+                    heights[x] = h
+            elif h == heights[x]:
+                heights[x] = self.column_height(x, h)
+
+    def __iter__(self):
+        for y in range(self.height):
+            yield Row(self, y)
+
+    def __eq__(self, other):
+        if isinstance(other, Board):
+            return [self.cells[o:o + self.width] for o in self.offsets] == \
+                   [other.cells[o:o + other.width] for o in other.offsets]
+        return [list(row) for row in self] == [list(row) for row in other]
+
+    __hash__ = None
+
+    # ---- cells ----
+    def index(self, value):
+        """Palette index for a written value: an index or a palette colour"""
+        if isinstance(value, tuple):
+            try:
+                return self.color_ids[value]
+            except KeyError:
+                raise ValueError(f"colour {value} is not in the board palette") from None
+        if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value < len(self.palette):
+            raise ValueError(f"{value!r} is not a palette index (0..{len(self.palette) - 1})")
+        return value
+
+    def cell(self, x, y):
+        return self.cells[self.offsets[y] + x]
+
+    def set_cell(self, x, y, value):
+        value = self.index(value)
+        at = self.offsets[y] + x
+        old = self.cells[at]
+        if bool(old) != bool(value):
+            self.fill[y] += 1 if value else -1
+        self.cells[at] = value
+        self._update_height(x, y, value)
+
+    def color(self, x, y):
+        """Colour of cell (x, y); palette[0] when empty"""
+        return self.palette[self.cells[self.offsets[y] + x]]
+
+    def row_colors(self, y):
+        o = self.offsets[y]
+        return [self.palette[c] for c in self.cells[o:o + self.width]]
+
+    def colors(self):
+        """Lazy rows of cell colours: colors()[y][x] resolves one row only"""
+        return _Colors(self)
+
+    # ---- heights ----
+    def _update_height(self, x, y, value):
+        h = self.height - y
+        if value:
+            if h > self.heights[x]:
+                self.heights[x] = h
+        elif h == self.heights[x]:
+            self.heights[x] = self.column_height(x, h)
+
+    def column_height(self, x, height=None):
+        """Height of column x's topmost block, searching down from the given height"""
+        if height is None:
+            height = self.height
+        cells, offsets = self.cells, self.offsets
+        while height > 0 and not cells[offsets[self.height - height] + x]:
+            height -= 1
+        return height
+
+    def recount(self):
+        """Recompute fills and heights from the cells"""
+        self.fill[:] = [self.width - self.cells.count(0, o, o + self.width) for o in self.offsets]
+        self.heights[:] = [self.column_height(x) for x in range(self.width)]
+
+    def clear_rows(self, full):
+        """Remove the given logical rows; empty rows enter at the top"""
+        if not full:
+            return
+        freed = []
+        keep = []
+        fill = []
+        for y, o in enumerate(self.offsets):
+            if y in full:
+                self.cells[o:o + self.width] = bytes(self.width)
+                freed.append(o)
+            else:
+                keep.append(o)
+                fill.append(self.fill[y])
+        self.offsets[:] = freed + keep
+        self.fill[:] = [0] * len(freed) + fill
+        # Every column's top block sat on or above the full rows, so it drops
+        # by the number cleared, or further if the top block itself was cleared
+        n = len(freed)
+        self.heights[:] = [self.column_height(x, max(0, h - n)) for x, h in enumerate(self.heights)]
+
+
+class _Colors:
+    __slots__ = ('board',)
+
+    def __init__(self, board):
+        self.board = board
+
+    def __len__(self):
+        return self.board.height
+
+    def __getitem__(self, y):
+        return self.board.row_colors(y)
+
+    def __iter__(self):
+        for y in range(self.board.height):
+            yield self.board.row_colors(y)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    __hash__ = None
@@ -0,0 +1,204 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import tokenize
+from multiprocessing import Pool
+
+# ----------------------------
+# Code metrics with a content-hash cache
+# ----------------------------
+# LOC, functional, empty and comment lines and LPE for one source file, plus
+# tokenizer counts. Results are stored on disk under the SHA-256 of the file's
+# bytes plus METRIC_VERSION, so an unchanged file is answered from the cache
+# without being re-classified; editing a file (or bumping the version when the
+# counting rules change) makes it miss and recompute.
+#
+# Files are hashed in chunks and then read line by line, never whole, so
+# memory stays flat whatever their size. Corpus mode walks a directory tree,
+# measures every source in a worker pool and appends one JSON line per file
+# as results arrive.
+
+METRIC_VERSION = 2
+CACHE_DIR = '.metrics_cache'
+CACHE_ENV = 'TETRIS_METRICS_CACHE'  # a directory, or 'off' to disable
+CHUNK = 1 << 20
+SUFFIXES = ('.py',)
+
+# Tokens that are layout rather than code
+_LAYOUT_TOKENS = {tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT,
+                  tokenize.ENDMARKER, tokenize.COMMENT}
+
+
+class _LineCounts:
+    def __init__(self):
+        self.total = self.empty = self.comment = 0
+
+    def add(self, line):
+        self.total += 1
+        stripped = line.strip()
+        if not stripped:
+            self.empty += 1
+        elif stripped.startswith('#'):
+            self.comment += 1
+
+    def result(self):
+        functional = self.total - self.empty - self.comment
+        lpe = (functional / self.total) * 100 if self.total > 0 else 0
+        return {'total_lines': self.total, 'functional_lines': functional,
+                'empty_lines': self.empty, 'comment_lines': self.comment, 'lpe': lpe}
+
+
+def count_lines(lines):
+    """Classify an iterable of source lines; returns the line metrics."""
+    counts = _LineCounts()
+    for line in lines:
+        counts.add(line)
+    return counts.result()
+
+
+def scan(f):
+    """Line and token metrics of an open text file, in one streaming pass.
+
+    The tokenizer pulls lines through the line counter. Sources that do not
+    tokenize (generated code is not always valid Python) keep their line
+    metrics and report 'tokenize_error'.
+    """
+    counts = _LineCounts()
+
+    def readline():
+        line = f.readline()
+        if line:
+            counts.add(line)
+        return line
+
+    tokens = comments = logical = 0
+    error = None
+    try:
+        for tok in tokenize.generate_tokens(readline):
+            if tok.type == tokenize.COMMENT:
+                comments += 1
+            elif tok.type == tokenize.NEWLINE:
+                logical += 1
+            if tok.type not in _LAYOUT_TOKENS:
+                tokens += 1
+    except (tokenize.TokenError, SyntaxError) as e:
+        error = str(e)
+    for line in iter(readline, ''):
+        pass
+    return dict(counts.result(), tokens=tokens, comment_tokens=comments,
+                logical_lines=logical, tokenize_error=error)
+
+
+def file_key(filename):
+    """SHA-256 of the metric version and the file's bytes, read in chunks."""
+    digest = hashlib.sha256(f"v{METRIC_VERSION}\0".encode())
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_dir_from_env():
+    path = os.environ.get(CACHE_ENV, CACHE_DIR)
+    return None if path == 'off' else path
+
+
+def file_metrics(filename, cache_dir=CACHE_DIR):
+    """Metrics for filename, from the cache when its contents are unchanged.
+
+    Raises FileNotFoundError like open(). The returned dict carries 'cached'
+    (whether it was a hit); cache_dir None skips the cache entirely.
+    """
+    key = file_key(filename)
+    path = os.path.join(cache_dir, f"{key}.json") if cache_dir else None
+    if path:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return dict(json.load(f), cached=True)
+        except (OSError, ValueError):
+            pass
+
+    # Text mode: same newline handling as the readlines() this replaced
+    with open(filename, 'r', encoding='utf-8') as f:
+        metrics = scan(f)
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(metrics, f)
+        os.replace(tmp, path)  # atomic, so parallel runs never see half a file
+    return dict(metrics, cached=False)
+
+
+# ----------------------------
+# Corpus mode
+# ----------------------------
+
+def walk_sources(root, suffixes=SUFFIXES):
+    """Source files under root in a stable (sorted) order, lazily."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d != '__pycache__')
+        for name in sorted(filenames):
+            if name.endswith(suffixes):
+                yield os.path.join(dirpath, name)
+
+
+def _measure(task):
+    path, cache_dir = task
+    try:
+        return dict(file_metrics(path, cache_dir), path=path)
+    except (OSError, UnicodeDecodeError) as e:
+        return {'path': path, 'error': f"{type(e).__name__}: {e}"}
+
+
+def run_corpus(root, output, workers=None, cache_dir=CACHE_DIR, chunksize=16):
+    """Measure every source under root into output (JSONL); returns a summary.
+
+    Paths are fed to the pool lazily and each result is written and flushed
+    as soon as it arrives (completion order, not path order), so neither the
+    file list nor the results are ever held in memory.
+    """
+    totals = {'files': 0, 'errors': 0, 'cached': 0, 'total_lines': 0,
+              'functional_lines': 0, 'tokens': 0}
+    start = time.perf_counter()
+    tasks = ((path, cache_dir) for path in walk_sources(root))
+    pool = Pool(workers or os.cpu_count() or 1)
+    try:
+        with open(output, 'w', encoding='utf-8') as out:
+            for entry in pool.imap_unordered(_measure, tasks, chunksize):
+                out.write(json.dumps(entry) + "\n")
+                out.flush()
+                totals['files'] += 1
+                if 'error' in entry:
+                    totals['errors'] += 1
+                    continue
+                totals['cached'] += entry['cached']
+                for name in ('total_lines', 'functional_lines', 'tokens'):
+                    totals[name] += entry[name]
+    finally:
+        pool.close()
+        pool.join()
+    totals['seconds'] = time.perf_counter() - start
+    totals['lpe'] = totals['functional_lines'] / totals['total_lines'] * 100 if totals['total_lines'] else 0
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Code metrics over a corpus of generated sources")
+    parser.add_argument('root', help="directory to walk")
+    parser.add_argument('--output', default='metrics.jsonl', help="JSONL written one file per line")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+
+    cache_dir = None if args.no_cache else cache_dir_from_env()
+    totals = run_corpus(args.root, args.output, args.workers, cache_dir)
+    print(f"{totals['files']} files ({totals['cached']} cached, {totals['errors']} errors) "
+          f"in {totals['seconds']:.2f}s | LOC {totals['total_lines']} | "
+          f"LPE {totals['lpe']:.2f}% | {totals['tokens']} tokens -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import tetris_claude
+import tetris_gemini
+import tetris_gpt
+
+# ----------------------------
+# Headless game registry
+# ----------------------------
+# One display-free constructor per model, so tools (self-play, replay,
+# benchmarks) can create and drive every implementation the same way
+# through Tetris.step(action) and Tetris.tick(dt_ms).
+MODELS = {
+    'gpt': lambda seed: tetris_gpt.Tetris(seed=seed),
+    'claude': lambda seed: tetris_claude.Tetris(headless=True, seed=seed),
+    'gemini': lambda seed: tetris_gemini.Tetris(tetris_gemini.BOARD_WIDTH, tetris_gemini.BOARD_HEIGHT, seed=seed),
+}
+
+# Inputs understood by every model's step()
+ACTIONS = ('left', 'right', 'rotate', 'down', 'drop')
+
+
+def new_game(model, seed=None):
+    if model not in MODELS:
+        raise ValueError(f"Unknown model: {model}")
+    return MODELS[model](seed)
@@ -0,0 +1,98 @@
+import atexit
+import json
+import os
+import time
+from array import array
+
+# ----------------------------
+# Input-to-photon latency probe
+# ----------------------------
+# Opt-in with TETRIS_LATENCY=<path>. Each main loop stamps a KEYDOWN as it comes
+# out of pygame.event.get(), again once the game has applied it (step()), and
+# once more when the frame showing it has been flipped. The two delays, key to
+# state change and key to frame, go into 1 ms histograms that are written out
+# as JSON at exit.
+
+LATENCY_ENV = 'TETRIS_LATENCY'
+HIST_BINS = 250  # 1 ms bins; slower samples land in the last one
+
+
+class LatencyHistogram:
+    def __init__(self, bins=HIST_BINS):
+        self.counts = array('I', bytes(4 * bins))
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.counts[min(int(ms), len(self.counts) - 1)] += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def percentile(self, p):
+        """Upper edge (ms) of the bin holding the p-th percentile, None when empty."""
+        n = self.count
+        if not n:
+            return None
+        rank = p / 100 * n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                return i + 1
+        return len(self.counts)
+
+    def to_dict(self):
+        n = self.count
+        return {'count': n, 'mean_ms': self.total_ms / n if n else None, 'max_ms': self.max_ms,
+                'p50_ms': self.percentile(50), 'p95_ms': self.percentile(95),
+                'p99_ms': self.percentile(99), 'counts': self.counts.tolist()}
+
+
+class LatencyProbe:
+    def __init__(self, model, clock=time.perf_counter_ns):
+        self.model = model
+        self.clock = clock
+        self.apply = LatencyHistogram()
+        self.photon = LatencyHistogram()
+        self._pending = []  # [key_ns, applied_ns] for inputs not shown yet
+
+    def key_down(self):
+        """A KEYDOWN that maps to a game action has just left the event queue."""
+        self._pending.append([self.clock(), None])
+
+    def applied(self):
+        """The game has applied the most recent key_down()."""
+        if self._pending and self._pending[-1][1] is None:
+            self._pending[-1][1] = self.clock()
+
+    def flipped(self):
+        """The frame with every pending input on it has been presented."""
+        if not self._pending:
+            return
+        now = self.clock()
+        for key_ns, applied_ns in self._pending:
+            self.apply.add(((applied_ns or now) - key_ns) / 1e6)
+            self.photon.add((now - key_ns) / 1e6)
+        self._pending.clear()
+
+    def to_dict(self):
+        return {'model': self.model, 'input_to_apply': self.apply.to_dict(),
+                'input_to_photon': self.photon.to_dict()}
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+
+
+def latency_from_env(model):
+    """LatencyProbe saved to TETRIS_LATENCY=<path> at exit, or None when unset."""
+    path = os.environ.get(LATENCY_ENV)
+    if not path:
+        return None
+    probe = LatencyProbe(model)
+    atexit.register(probe.save, path)
+    return probe
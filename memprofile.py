@@ -0,0 +1,132 @@
+import argparse
+import gc
+import random
+import tracemalloc
+
+from headless import MODELS, new_game
+from selfplay import POLICIES
+
+# ----------------------------
+# Memory footprint profiler
+# ----------------------------
+# Uses tracemalloc to measure, per model, the steady-state bytes and blocks
+# held by one live game instance (board, colour grids, current/next piece)
+# and the allocation churn of playing it: bytes allocated transiently per
+# action (peak above the pre-action level) and bytes retained per action.
+# Allocation sites cover the model's module and the shared board.py.
+# Module-level caches are warmed by a throwaway game first, so they are not
+# charged to the measured instances.
+
+GAMES = 20  # live instances measured together, then divided
+ACTIONS = 1000
+WARMUP_ACTIONS = 200
+POLICY = 'random'
+
+
+def _play(game, rng_seed, actions, policy=POLICY):
+    choose = POLICIES[policy](random.Random(rng_seed))
+    n = 0
+    while n < actions and game.step(choose(game)):
+        n += 1
+    return n
+
+
+def game_footprint(model, games=GAMES, warmup=WARMUP_ACTIONS, top=5):
+    """Steady-state bytes/blocks per live game, with the top allocation sites."""
+    _play(new_game(model, 0), 0, warmup)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        instances = []
+        for seed in range(1, games + 1):
+            game = new_game(model, seed)
+            _play(game, seed, warmup)
+            instances.append(game)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # The model's module plus board.py, which holds the claude/gemini cells
+    engine = [tracemalloc.Filter(True, f"*tetris_{model}.py"), tracemalloc.Filter(True, "*board.py")]
+    diff = after.compare_to(before, 'lineno')
+    total_bytes = sum(d.size_diff for d in diff)
+    total_blocks = sum(d.count_diff for d in diff)
+    sites = after.filter_traces(engine).compare_to(before.filter_traces(engine), 'lineno')
+    sites = [d for d in sites if d.size_diff > 0][:top]
+    del instances
+    return {
+        'bytes_per_game': total_bytes / games,
+        'blocks_per_game': total_blocks / games,
+        'top_sites': [{'site': f"{d.traceback[0].filename.rsplit('/', 1)[-1]}:{d.traceback[0].lineno}",
+                       'bytes_per_game': d.size_diff / games} for d in sites],
+    }
+
+
+def action_churn(model, actions=ACTIONS, seed=0, policy=POLICY):
+    """Transient and retained bytes per action over one seeded game.
+
+    Transient bytes are the traced peak during an action above the level it
+    started at: a rotation that builds and discards a new shape shows up
+    here even though nothing is kept.
+    """
+    _play(new_game(model, seed), seed, WARMUP_ACTIONS)  # warm module caches
+    game = new_game(model, seed)
+    choose = POLICIES[policy](random.Random(seed))
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        transient = 0
+        n = 0
+        while n < actions:
+            action = choose(game)
+            level, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            alive = game.step(action)
+            _, peak = tracemalloc.get_traced_memory()
+            transient += peak - level
+            n += 1
+            if not alive:
+                break
+        gc.collect()
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'actions': n,
+        'transient_bytes_per_action': transient / n if n else 0.0,
+        'retained_bytes_per_action': (end - start) / n if n else 0.0,
+    }
+
+
+def profile(model, games=GAMES, actions=ACTIONS, top=5):
+    return dict(game_footprint(model, games, top=top), **action_churn(model, actions), model=model)
+
+
+def print_report(results):
+    print("\n" + "=" * 50)
+    print("[MEMORY FOOTPRINT] tracemalloc, per live game")
+    print("=" * 50)
+    for r in results:
+        print(f"  {r['model']:<7}: {r['bytes_per_game'] / 1024:.1f} KiB/game "
+              f"({r['blocks_per_game']:.0f} blocks) | {r['transient_bytes_per_action']:.0f} B transient"
+              f" / {r['retained_bytes_per_action']:.1f} B retained per action")
+        for site in r['top_sites']:
+            print(f"           {site['bytes_per_game']:>8.0f} B  {site['site']}")
+    print("=" * 50 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tracemalloc memory footprint of each model's Tetris")
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), default=list(MODELS))
+    parser.add_argument('--games', type=int, default=GAMES, help="live instances to average over")
+    parser.add_argument('--actions', type=int, default=ACTIONS, help="actions for the churn measurement")
+    parser.add_argument('--top', type=int, default=5, help="allocation sites listed per model")
+    args = parser.parse_args()
+    print_report([profile(model, args.games, args.actions, args.top) for model in args.models])
+
+
+if __name__ == "__main__":
+    main()
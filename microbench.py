@@ -0,0 +1,325 @@
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+
+import tetris_claude
+import tetris_gemini
+import tetris_gpt
+from board import Board
+
+# ----------------------------
+# Engine primitive microbenchmarks
+# ----------------------------
+# Times the hot primitives of each model under fixed, seeded workloads: the
+# same boards and the same inputs on every run. Each benchmark is repeated
+# and summarised as the mean time per call with a 95% confidence interval.
+# Against a stored baseline, a benchmark regresses when its mean is more than
+# the threshold slower and the two intervals do not overlap. Boards a workload
+# consumes (clear_lines empties its full rows) are rebuilt by an untimed
+# prepare step before every run, so only the primitive itself is measured.
+
+REPEATS = 20
+THRESHOLD = 0.10
+INPUTS = 500  # calls per workload
+CLEARS = 500  # boards consumed per clear_lines run
+
+# Two-sided 95% Student t quantiles by degrees of freedom (normal beyond 30)
+_T95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+
+def _gpt_board(bitboard=False):
+    rng = random.Random(1)
+    grid = tetris_gpt.BitBoard() if bitboard else tetris_gpt.create_grid()
+    for y in range(tetris_gpt.ROWS // 2, tetris_gpt.ROWS):
+        grid[y] = [None if rng.random() < 0.3 else 'T' for _ in range(tetris_gpt.COLS)]
+    return grid
+
+
+def _gpt_inputs():
+    rng = random.Random(2)
+    letters = list(tetris_gpt.PIECES)
+    return [(rng.choice(letters), rng.randrange(4), rng.randrange(-1, tetris_gpt.COLS - 2),
+             rng.randrange(-2, tetris_gpt.ROWS - 2)) for _ in range(INPUTS)]
+
+
+# Each setup returns (calls per run, zero-argument workload), optionally
+# followed by a zero-argument prepare step run untimed before each workload run
+
+def gpt_valid_position(bitboard=False):
+    grid, inputs = _gpt_board(bitboard), _gpt_inputs()
+    valid = tetris_gpt.valid_position
+
+    def run():
+        for letter, rot, px, py in inputs:
+            valid(grid, letter, rot, px, py)
+    return len(inputs), run
+
+
+def gpt_lock_piece():
+    grid, inputs = tetris_gpt.create_grid(), _gpt_inputs()
+    inputs = [i for i in inputs if tetris_gpt.valid_position(grid, *i)]
+    lock = tetris_gpt.lock_piece
+
+    def run():
+        for letter, rot, px, py in inputs:
+            lock(grid, letter, rot, px, py)
+    return len(inputs), run
+
+
+def gpt_clear_lines():
+    grids = []
+    full = [['I'] * tetris_gpt.COLS for _ in range(4)]
+    clear = tetris_gpt.clear_lines
+
+    def prepare():
+        # Four full rows per board, written as whole rows (what a clear needs to see)
+        grids[:] = [tetris_gpt.create_grid() for _ in range(CLEARS)]
+        for grid in grids:
+            grid[tetris_gpt.ROWS - 4:] = full
+
+    def run():
+        for grid in grids:
+            clear(grid)
+    return CLEARS, run, prepare
+
+
+def gpt_compute_ghost_y(cached=False):
+    grid = _gpt_board()
+    inputs = [(letter, rot, px, -2) for letter, rot, px, _ in _gpt_inputs()
+              if tetris_gpt.valid_position(grid, letter, rot, px, -2)]
+    ghost = tetris_gpt.compute_ghost_y
+
+    def run():
+        for letter, rot, px, py in inputs:
+            if not cached:
+                grid.version += 1  # as after a lock: the landing row is recomputed
+            ghost(grid, letter, rot, px, py)
+    return len(inputs), run
+
+
+def gpt_rotate():
+    game = tetris_gpt.Tetris(seed=3)
+    game.grid[:] = [list(row) for row in _gpt_board()]
+
+    def run():
+        for i in range(INPUTS):
+            game.rotate(cw=i % 3 != 0)
+    return INPUTS, run
+
+
+def _claude_game():
+    game = tetris_claude.Tetris(headless=True, seed=3)
+    rng = random.Random(1)
+    for y in range(tetris_claude.GRID_HEIGHT // 2, tetris_claude.GRID_HEIGHT):
+        game.grid[y] = [0 if rng.random() < 0.3 else 1 for _ in range(tetris_claude.GRID_WIDTH)]
+    game.rebuild_heights()
+    return game
+
+
+def claude_valid_move():
+    game = _claude_game()
+    rng = random.Random(2)
+    pieces = [tetris_claude.Tetromino(name) for name in tetris_claude.SHAPES]
+    inputs = [(rng.choice(pieces), rng.randrange(-1, tetris_claude.GRID_WIDTH - 1),
+               rng.randrange(-1, tetris_claude.GRID_HEIGHT - 1)) for _ in range(INPUTS)]
+
+    def run():
+        for piece, x, y in inputs:
+            game.valid_move(piece, x, y)
+    return len(inputs), run
+
+
+def _full_boards(width, height, palette):
+    # CLEARS boards with their bottom four rows full of palette id 1
+    boards = []
+    for _ in range(CLEARS):
+        board = Board(width, height, palette)
+        board[height - 4:] = [[1] * width for _ in range(4)]
+        boards.append(board)
+    return boards
+
+
+def claude_clear_lines():
+    game = tetris_claude.Tetris(headless=True, seed=3)
+    boards = []
+
+    def prepare():
+        boards[:] = _full_boards(tetris_claude.GRID_WIDTH, tetris_claude.GRID_HEIGHT,
+                                 tetris_claude.PALETTE)
+
+    def run():
+        for board in boards:
+            game.grid = board
+            game.clear_lines()
+    return CLEARS, run, prepare
+
+
+def claude_rotate_piece():
+    game = _claude_game()
+
+    def run():
+        for _ in range(INPUTS):
+            game.rotate_piece()
+    return INPUTS, run
+
+
+def _gemini_game():
+    game = tetris_gemini.Tetris(tetris_gemini.BOARD_WIDTH, tetris_gemini.BOARD_HEIGHT, seed=3)
+    rng = random.Random(1)
+    for y in range(game.height // 2, game.height):
+        game.grid[y] = [0 if rng.random() < 0.3 else 1 for _ in range(game.width)]
+    game.new_piece()
+    return game
+
+
+def gemini_check_collision():
+    game = _gemini_game()
+    rng = random.Random(2)
+    inputs = [tetris_gemini.Tetromino(rng.randrange(0, game.width - 2), rng.randrange(0, game.height - 2),
+                                      rng.choice(tetris_gemini.SHAPES)) for _ in range(INPUTS)]
+
+    def run():
+        for piece in inputs:
+            game.check_collision(piece)
+    return len(inputs), run
+
+
+def gemini_clear_lines():
+    game = tetris_gemini.Tetris(tetris_gemini.BOARD_WIDTH, tetris_gemini.BOARD_HEIGHT, seed=3)
+    boards = []
+
+    def prepare():
+        boards[:] = _full_boards(game.width, game.height, tetris_gemini.PALETTE)
+
+    def run():
+        for board in boards:
+            game.grid = board
+            game.clear_lines()
+    return CLEARS, run, prepare
+
+
+def gemini_rotate():
+    game = _gemini_game()
+
+    def run():
+        for _ in range(INPUTS):
+            game.rotate()
+    return INPUTS, run
+
+
+BENCHMARKS = {
+    'gpt': {
+        'valid_position': gpt_valid_position,
+        'valid_position[bitboard]': lambda: gpt_valid_position(bitboard=True),
+        'lock_piece': gpt_lock_piece,
+        'clear_lines': gpt_clear_lines,
+        'compute_ghost_y': gpt_compute_ghost_y,
+        'compute_ghost_y[cached]': lambda: gpt_compute_ghost_y(cached=True),
+        'Tetris.rotate': gpt_rotate,
+    },
+    'claude': {
+        'Tetris.valid_move': claude_valid_move,
+        'Tetris.clear_lines': claude_clear_lines,
+        'Tetris.rotate_piece': claude_rotate_piece,
+    },
+    'gemini': {
+        'Tetris.check_collision': gemini_check_collision,
+        'Tetris.clear_lines': gemini_clear_lines,
+        'Tetris.rotate': gemini_rotate,
+    },
+}
+
+
+def summarize(samples):
+    """Mean, stdev and 95% confidence interval (ns per call) of per-call samples."""
+    n = len(samples)
+    mean = statistics.fmean(samples)
+    stdev = statistics.stdev(samples) if n > 1 else 0.0
+    t = _T95[n - 2] if 2 <= n <= len(_T95) + 1 else 1.96
+    half = t * stdev / math.sqrt(n)
+    return {'mean_ns': mean, 'stdev_ns': stdev, 'ci95_ns': [mean - half, mean + half], 'repeats': n}
+
+
+def run_benchmark(setup, repeats=REPEATS):
+    calls, run, *prepare = setup()
+    prepare = prepare[0] if prepare else (lambda: None)
+    prepare()
+    run()  # warm-up: caches, sprite/ghost tables, first-call costs
+    samples = []
+    for _ in range(repeats):
+        prepare()
+        gc.collect()  # so the boards prepare() allocated are not collected mid-run
+        start = time.perf_counter_ns()
+        run()
+        samples.append((time.perf_counter_ns() - start) / calls)
+    return summarize(samples)
+
+
+def run_all(models=None, repeats=REPEATS):
+    results = {}
+    for model in models or BENCHMARKS:
+        for name, setup in BENCHMARKS[model].items():
+            results[f"{model}.{name}"] = run_benchmark(setup, repeats)
+    return {'python': platform.python_version(), 'machine': platform.machine(),
+            'repeats': repeats, 'benchmarks': results}
+
+
+def compare(current, baseline, threshold=THRESHOLD):
+    """Per benchmark present in both: change vs baseline and whether it regressed."""
+    report = {}
+    for name, now in current['benchmarks'].items():
+        before = baseline['benchmarks'].get(name)
+        if before is None:
+            continue
+        change = now['mean_ns'] / before['mean_ns'] - 1
+        regressed = change > threshold and now['ci95_ns'][0] > before['ci95_ns'][1]
+        report[name] = {'baseline_ns': before['mean_ns'], 'current_ns': now['mean_ns'],
+                        'change': change, 'regressed': regressed}
+    return report
+
+
+def print_report(results, comparison=None):
+    print(f"{'benchmark':<38} {'ns/call':>10} {'95% CI':>21} {'vs base':>9}")
+    for name, r in results['benchmarks'].items():
+        lo, hi = r['ci95_ns']
+        line = f"{name:<38} {r['mean_ns']:>10.0f} {lo:>10.0f}-{hi:<10.0f}"
+        if comparison and name in comparison:
+            c = comparison[name]
+            line += f" {c['change']:>+8.1%}" + ("  REGRESSION" if c['regressed'] else "")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks of each model's engine primitives")
+    parser.add_argument('--models', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--output', help="write results JSON here")
+    parser.add_argument('--baseline', help="baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="relative slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    results = run_all(args.models, args.repeats)
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            comparison = compare(results, json.load(f), args.threshold)
+        results['comparison'] = comparison
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    print_report(results, comparison)
+    if comparison and any(c['regressed'] for c in comparison.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
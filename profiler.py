@@ -0,0 +1,115 @@
+import atexit
+import json
+import os
+import time
+from array import array
+
+import pygame
+
+# ----------------------------
+# Frame-time profiler
+# ----------------------------
+# Opt-in with TETRIS_PROFILE=<path> (p50/p95/p99 per phase written as JSON at
+# exit) and/or TETRIS_PROFILE_OVERLAY=1 (frame-time graph drawn in the game
+# window). The main loop calls start() once its frame begins, mark(phase) as
+# each phase finishes, then end_frame(). Timings live in a ring buffer that is
+# allocated once, so profiling adds no per-frame allocations.
+
+PHASES = ('event', 'update', 'render', 'flip')
+PHASE_COLORS = ((90, 160, 255), (120, 220, 120), (240, 200, 80), (230, 90, 90))
+RING_FRAMES = 600
+GRAPH_MS = 33.3  # frame time at the top of the overlay graph
+PROFILE_ENV = 'TETRIS_PROFILE'
+OVERLAY_ENV = 'TETRIS_PROFILE_OVERLAY'
+
+
+class FrameProfiler:
+    def __init__(self, model, frames=RING_FRAMES, clock=time.perf_counter_ns):
+        self.model = model
+        self.clock = clock
+        self.size = frames
+        # ms, one row of phases per frame, plus a slot for the frame in progress
+        self.times = array('d', bytes(8 * (frames + 1) * len(PHASES)))
+        self.index = 0   # ring slot of the frame being timed
+        self.count = 0   # frames recorded so far, capped at size
+        self.overlay = False
+        self._phase = {name: i for i, name in enumerate(PHASES)}
+        self._last = 0
+
+    def start(self):
+        self._last = self.clock()
+
+    def mark(self, phase):
+        """Charge the time since start() or the previous mark() to phase."""
+        now = self.clock()
+        self.times[self.index * len(PHASES) + self._phase[phase]] = (now - self._last) / 1e6
+        self._last = now
+
+    def end_frame(self):
+        self.index = (self.index + 1) % (self.size + 1)
+        self.count = min(self.count + 1, self.size)
+        base = self.index * len(PHASES)
+        for i in range(base, base + len(PHASES)):
+            self.times[i] = 0.0
+
+    def frame_times(self, phase=None):
+        """Recorded frames oldest first, as ms for one phase or for the whole frame."""
+        n = len(PHASES)
+        first = self.index - self.count
+        slots = [(first + i) % (self.size + 1) for i in range(self.count)]
+        if phase is None:
+            return [sum(self.times[s * n:(s + 1) * n]) for s in slots]
+        i = self._phase[phase]
+        return [self.times[s * n + i] for s in slots]
+
+    def stats(self):
+        result = {}
+        for phase in PHASES + (None,):
+            times = sorted(self.frame_times(phase))
+            if not times:
+                continue
+            pick = lambda p: times[min(len(times) - 1, int(p / 100 * len(times)))]
+            result[phase or 'frame'] = {'mean_ms': sum(times) / len(times), 'max_ms': times[-1],
+                                        'p50_ms': pick(50), 'p95_ms': pick(95), 'p99_ms': pick(99)}
+        return result
+
+    def to_dict(self):
+        return {'model': self.model, 'frames': self.count, 'phases': self.stats()}
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def draw_overlay(self, surface, rect):
+        """Stacked per-phase bars for the last rect.width frames; returns rect."""
+        surface.fill((0, 0, 0), rect)
+        n = len(PHASES)
+        scale = rect.height / GRAPH_MS
+        shown = min(self.count, rect.width)
+        for i in range(shown):
+            slot = (self.index - shown + i) % (self.size + 1)
+            x = rect.right - shown + i
+            y = rect.bottom
+            for p in range(n):
+                h = self.times[slot * n + p] * scale
+                if h >= 1:
+                    top = max(rect.top, y - int(h))
+                    pygame.draw.line(surface, PHASE_COLORS[p], (x, y - 1), (x, top))
+                    y = top
+        # 60 FPS budget line
+        budget = rect.bottom - int(1000 / 60 * scale)
+        pygame.draw.line(surface, (200, 200, 200), (rect.left, budget), (rect.right - 1, budget))
+        return rect
+
+
+def profiler_from_env(model):
+    """FrameProfiler when TETRIS_PROFILE or TETRIS_PROFILE_OVERLAY is set, else None."""
+    path = os.environ.get(PROFILE_ENV)
+    overlay = os.environ.get(OVERLAY_ENV, '') not in ('', '0')
+    if not path and not overlay:
+        return None
+    profiler = FrameProfiler(model)
+    profiler.overlay = overlay
+    if path:
+        atexit.register(profiler.save, path)
+    return profiler
@@ -0,0 +1,86 @@
+import atexit
+import json
+import os
+from array import array
+
+# ----------------------------
+# Game recording and replay
+# ----------------------------
+# A recording is the game's seed plus a compact input log: one dt (ms) per
+# frame in an array, and (frame, action) for every step() input. Since every
+# game draws its pieces from its own seeded RNG, feeding the same inputs at
+# the same frames reproduces the exact final grid and score.
+
+RECORD_ENV = 'TETRIS_RECORD'
+
+
+class Recording:
+    def __init__(self, model, seed, frames=(), inputs=()):
+        self.model = model
+        self.seed = seed
+        self.frames = array('I', frames)
+        self.inputs = [tuple(i) for i in inputs]
+
+    def add_input(self, action):
+        self.inputs.append((len(self.frames), action))
+
+    def add_frame(self, dt_ms):
+        self.frames.append(dt_ms)
+
+    def events(self):
+        """Yield (t_ms, action) for every recorded input, in order."""
+        t = 0
+        frame = 0
+        for at, action in self.inputs:
+            while frame < at:
+                t += self.frames[frame]
+                frame += 1
+            yield t, action
+
+    def to_dict(self):
+        return {'model': self.model, 'seed': self.seed,
+                'frames': self.frames.tolist(), 'inputs': [list(i) for i in self.inputs]}
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['model'], data['seed'], data['frames'], data['inputs'])
+
+
+def record_from_env(game, model):
+    """Attach a Recording to game when TETRIS_RECORD=<path> is set; saved at exit."""
+    path = os.environ.get(RECORD_ENV)
+    if path:
+        game.recording = Recording(model, game.seed)
+        atexit.register(game.recording.save, path)
+    return game
+
+
+def replay(recording):
+    """Re-run a recording headlessly at full speed and return the final game."""
+    from headless import new_game
+
+    game = new_game(recording.model, recording.seed)
+    inputs = recording.inputs
+    i = 0
+    for frame, dt_ms in enumerate(recording.frames):
+        while i < len(inputs) and inputs[i][0] == frame:
+            game.step(inputs[i][1])
+            i += 1
+        game.tick(dt_ms)
+    for _, action in inputs[i:]:
+        game.step(action)
+    return game
+
+
+if __name__ == "__main__":
+    import sys
+
+    for path in sys.argv[1:]:
+        game = replay(Recording.load(path))
+        print(f"{path}: score={game.score} lines={game.lines} game_over={game.game_over}")
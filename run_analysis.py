@@ -0,0 +1,134 @@
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+import time
+import unittest
+from multiprocessing import Pool
+
+# Workers must see the dummy driver before pygame is first imported
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# ----------------------------
+# Parallel analisis runner
+# ----------------------------
+# Runs the analisis_* suites (10 scenarios, LOC/LPE and runtime throughput
+# per model) in one worker process each, headless through SDL's dummy video
+# driver, and prints one combined report with per-test durations. Wall time
+# is that of the slowest suite rather than the sum.
+
+SUITES = {
+    'gpt': ('analisis_gpt', 'tetris_gpt.py'),
+    'claude': ('analisis_claude', 'tetris_claude.py'),
+    'gemini': ('analisis_gemini', 'tetris_gemini.py'),
+}
+
+
+class TimedResult(unittest.TestResult):
+    """TestResult that keeps (test id, status, seconds, message) per test."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self._start = None
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._start = time.perf_counter()
+
+    def _record(self, test, status, message=''):
+        self.records.append({'test': test.id().split('.', 1)[-1], 'status': status,
+                             'seconds': time.perf_counter() - self._start, 'message': message})
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._record(test, 'ok')
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record(test, 'FAIL', self.failures[-1][1].strip().splitlines()[-1])
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._record(test, 'ERROR', self.errors[-1][1].strip().splitlines()[-1])
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._record(test, 'skip', reason)
+
+
+def run_suite(model):
+    """Run one model's analisis suite and metrics; returns a JSON-able dict."""
+    module_name, source = SUITES[model]
+    start = time.perf_counter()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        module = importlib.import_module(module_name)
+        from throughput import print_throughput
+        suite = unittest.defaultTestLoader.loadTestsFromModule(module)
+        result = TimedResult()
+        suite.run(result)
+        module.calculate_metrics(source)
+        print_throughput(model)
+        if 'pygame' in sys.modules:
+            sys.modules['pygame'].quit()
+    return {'model': model, 'tests': result.records, 'run': result.testsRun,
+            'failures': len(result.failures), 'errors': len(result.errors),
+            'seconds': time.perf_counter() - start, 'output': output.getvalue()}
+
+
+def run_suites(models, workers=None):
+    """Run the suites in parallel; returns (results in models order, wall seconds)."""
+    start = time.perf_counter()
+    # A fresh process per suite; close/join rather than terminate, since SDL
+    # turns SIGTERM into a quit event and a terminated worker would linger
+    pool = Pool(workers or len(models), maxtasksperchild=1)
+    try:
+        results = pool.map(run_suite, models, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+    return results, time.perf_counter() - start
+
+
+def format_report(results, wall):
+    lines = []
+    for r in results:
+        lines.append("=" * 60)
+        lines.append(f"[{r['model']}] {r['run']} tests, {r['failures']} failures, "
+                     f"{r['errors']} errors in {r['seconds']:.2f}s")
+        lines.append("=" * 60)
+        for t in r['tests']:
+            lines.append(f"  {t['status']:<6} {t['seconds'] * 1000:8.1f} ms  {t['test']}")
+            if t['message']:
+                lines.append(f"         {t['message']}")
+        metrics = [line.strip() for line in r['output'].splitlines() if line.strip().startswith('- ')]
+        lines.extend(f"  {m}" for m in metrics)
+    total = sum(r['seconds'] for r in results)
+    lines.append("=" * 60)
+    lines.append(f"Wall time {wall:.2f}s (suites sum to {total:.2f}s)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all analisis suites in parallel, headless")
+    parser.add_argument('--models', nargs='+', choices=list(SUITES), default=list(SUITES))
+    parser.add_argument('--workers', type=int, default=None, help="default: one per suite")
+    parser.add_argument('--json', help="also write the combined results here")
+    args = parser.parse_args()
+
+    results, wall = run_suites(args.models, args.workers)
+    print(format_report(results, wall))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'wall_seconds': wall, 'suites': results}, f, indent=2)
+    if any(r['failures'] or r['errors'] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
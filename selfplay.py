@@ -0,0 +1,109 @@
+import argparse
+import os
+import random
+import time
+from multiprocessing import Pool
+
+from headless import MODELS, ACTIONS, new_game
+
+# ----------------------------
+# Self-play runtime benchmark
+# ----------------------------
+# Plays M seeded games per model with a fixed policy, sharded across a process
+# pool, and reports pieces/sec, lines/sec and wall time per model.
+
+RANDOM_WEIGHTS = (3, 3, 2, 1, 1)  # left, right, rotate, down, drop
+
+
+def random_policy(rng):
+    def choose(game):
+        return rng.choices(ACTIONS, RANDOM_WEIGHTS)[0]
+    return choose
+
+
+def scripted_policy(rng):
+    # Per piece: a few rotations, slide to one side, hard drop
+    plan = []
+
+    def choose(game):
+        if not plan:
+            plan.append('drop')
+            plan.extend([rng.choice(('left', 'right'))] * rng.randrange(6))
+            plan.extend(['rotate'] * rng.randrange(4))
+        return plan.pop()
+    return choose
+
+
+POLICIES = {'random': random_policy, 'scripted': scripted_policy}
+
+
+def play_game(model, seed, policy='random', max_actions=5000):
+    """Play one seeded game headlessly; returns (pieces, lines, actions)."""
+    game = new_game(model, seed)
+    choose = POLICIES[policy](random.Random(seed))
+    actions = 0
+    while actions < max_actions and game.step(choose(game)):
+        actions += 1
+    return game.pieces, game.lines, actions
+
+
+def _play_shard(args):
+    model, seeds, policy, max_actions = args
+    pieces = lines = actions = 0
+    for seed in seeds:
+        p, l, a = play_game(model, seed, policy, max_actions)
+        pieces += p
+        lines += l
+        actions += a
+    return pieces, lines, actions
+
+
+def run(models, games, policy='random', workers=None, max_actions=5000, base_seed=0):
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(base_seed, base_seed + games))
+    results = {}
+    with Pool(workers) as pool:
+        for model in models:
+            shards = [(model, seeds[i::workers], policy, max_actions) for i in range(workers)]
+            start = time.perf_counter()
+            totals = pool.map(_play_shard, [s for s in shards if s[1]])
+            wall = time.perf_counter() - start
+            pieces, lines, actions = (sum(t[i] for t in totals) for i in range(3))
+            results[model] = {
+                'games': games,
+                'pieces': pieces,
+                'lines': lines,
+                'actions': actions,
+                'wall_time': wall,
+                'pieces_per_sec': pieces / wall if wall else 0.0,
+                'lines_per_sec': lines / wall if wall else 0.0,
+            }
+    return results
+
+
+def print_report(results, policy, workers):
+    print("\n" + "=" * 50)
+    print(f"[SELF-PLAY BENCHMARK] policy={policy}, workers={workers}")
+    print("=" * 50)
+    for model, r in results.items():
+        print(f"  {model:<7}: {r['games']} games | wall {r['wall_time']:.2f}s"
+              f" | {r['pieces_per_sec']:.1f} pieces/s | {r['lines_per_sec']:.1f} lines/s")
+    print("=" * 50 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seeded self-play runtime benchmark")
+    parser.add_argument('--games', type=int, default=200, help="games per model")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), default=list(MODELS))
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--max-actions', type=int, default=5000, help="per-game action cap")
+    parser.add_argument('--seed', type=int, default=0, help="first game seed")
+    args = parser.parse_args()
+
+    results = run(args.models, args.games, args.policy, args.workers, args.max_actions, args.seed)
+    print_report(results, args.policy, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import unittest
+
+from board import Board
+
+BLACK, RED, BLUE = (0, 0, 0), (255, 0, 0), (0, 0, 255)
+W, H = 4, 6
+
+
+class TestBoard(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Board(W, H, [BLACK, RED, BLUE])
+
+    def test_clear_moves_offsets_not_rows(self):
+        board = self.board
+        cells = board.cells
+        board[H - 1] = [1] * W
+        board[H - 2] = [2, 0, 0, 0]
+        board[H - 3] = [RED] * W
+        board.clear_rows({H - 1, H - 3})
+        self.assertIs(board.cells, cells)
+        self.assertEqual(sorted(board.offsets), [y * W for y in range(H)])
+        self.assertEqual(board[H - 1], [2, 0, 0, 0])
+        self.assertEqual(board, [[0] * W] * (H - 1) + [[2, 0, 0, 0]])
+        self.assertEqual(board.fill, [0] * (H - 1) + [1])
+        self.assertEqual(board.heights, [1, 0, 0, 0])
+        self.assertEqual((board.color(0, H - 1), board.color(1, H - 1)), (BLUE, BLACK))
+
+    def test_rows_are_writable_views(self):
+        board = self.board
+        row = board[H - 1]
+        row[2] = BLUE
+        board[-2][0] = 1
+        self.assertEqual(board[H - 1], [0, 0, 2, 0])
+        self.assertEqual(row, [0, 0, 2, 0])
+        self.assertEqual(board.fill[H - 2:], [1, 1])
+        self.assertEqual(board.heights, [2, 0, 1, 0])
+        board[H - 2][0] = 0
+        self.assertEqual(board.heights, [0, 0, 1, 0])
+        self.assertEqual(board.fill[H - 2], 0)
+
+    def test_slices(self):
+        board = self.board
+        board[H - 2:] = [[1] * W, [2] * W]
+        self.assertEqual(board[H - 2:], [[1] * W, [2] * W])
+        self.assertEqual(len(board[:]), H)
+        self.assertEqual(board[H - 1][1:3], [2, 2])
+        self.assertEqual(board.heights, [2] * W)
+        with self.assertRaises(ValueError):
+            board[0:2] = [[0] * W]
+
+    def test_bad_writes_raise_and_leave_the_board_intact(self):
+        board = self.board
+        before = bytes(board.cells)
+        for row in ([1] * (W - 1), [1] * (W + 1), [(255, 255, 255)] * W, [256] * W, [3] * W):
+            with self.assertRaises(ValueError, msg=row):
+                board[0] = row
+        with self.assertRaises(ValueError):
+            board[0][0] = (1, 2, 3)
+        with self.assertRaises(IndexError):
+            board[H]
+        with self.assertRaises(IndexError):
+            board[0][W] = 1
+        self.assertEqual(bytes(board.cells), before)
+        self.assertEqual(len(board.cells), W * H)
+
+    def test_lazy_colors(self):
+        board = self.board
+        board[0][1] = RED
+        colors = board.colors()
+        self.assertEqual(colors[0], [BLACK, RED, BLACK, BLACK])
+        board[0][1] = 0
+        self.assertEqual(colors[0][1], BLACK)
+        self.assertEqual(len(list(colors)), H)
+
+
+if __name__ == '__main__':
+    unittest.main()
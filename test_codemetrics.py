@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import unittest
+
+import codemetrics
+from codemetrics import count_lines, file_metrics, run_corpus, walk_sources
+
+
+class TestCodeMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = os.path.join(self.tmp.name, 'cache')
+        self.source = os.path.join(self.tmp.name, 'game.py')
+        self.write("import pygame\r\n\r\n# comment\r\nx = 1\r\n")
+
+    def write(self, text):
+        with open(self.source, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+
+    def test_counts_match_readlines(self):
+        metrics = file_metrics(self.source, cache_dir=None)
+        self.assertEqual((metrics['total_lines'], metrics['functional_lines'],
+                          metrics['empty_lines'], metrics['comment_lines']), (4, 2, 1, 1))
+        self.assertAlmostEqual(metrics['lpe'], 50.0)
+        for name in ('analisis_gpt.py', 'tetris_claude.py'):
+            with open(name, 'r', encoding='utf-8') as f:
+                expected = count_lines(f.readlines())
+            metrics = file_metrics(name, cache_dir=None)
+            self.assertEqual({k: metrics[k] for k in expected}, expected)
+
+    def test_cache_hits_until_contents_or_version_change(self):
+        first = file_metrics(self.source, self.cache)
+        self.assertFalse(first['cached'])
+        second = file_metrics(self.source, self.cache)
+        self.assertTrue(second['cached'])
+        self.assertEqual(dict(first, cached=True), second)
+
+        self.write("x = 1\n")
+        edited = file_metrics(self.source, self.cache)
+        self.assertFalse(edited['cached'])
+        self.assertEqual(edited['total_lines'], 1)
+
+        old = codemetrics.METRIC_VERSION
+        codemetrics.METRIC_VERSION = old + 1
+        self.addCleanup(setattr, codemetrics, 'METRIC_VERSION', old)
+        self.assertFalse(file_metrics(self.source, self.cache)['cached'])
+        self.assertEqual(len(os.listdir(self.cache)), 3)
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            file_metrics(os.path.join(self.tmp.name, 'missing.py'), self.cache)
+
+    def test_token_counts(self):
+        metrics = file_metrics(self.source, cache_dir=None)
+        # import pygame / x = 1 / x
+        self.assertEqual((metrics['tokens'], metrics['comment_tokens'], metrics['logical_lines']), (5, 1, 2))
+        self.assertIsNone(metrics['tokenize_error'])
+
+        self.write("def f(:\n    return (1,\n\n# trailing\n")
+        broken = file_metrics(self.source, cache_dir=None)
+        self.assertIsNotNone(broken['tokenize_error'])
+        self.assertEqual((broken['total_lines'], broken['comment_lines']), (4, 1))
+
+
+class TestCorpus(unittest.TestCase):
+
+    def test_corpus_jsonl(self):
+        with tempfile.TemporaryDirectory() as root:
+            for i in range(30):
+                sub = os.path.join(root, f"variant_{i % 3}")
+                os.makedirs(sub, exist_ok=True)
+                with open(os.path.join(sub, f"tetris_{i}.py"), 'w', encoding='utf-8') as f:
+                    f.write("# variant\n" + "x = 1\n" * (i + 1))
+            with open(os.path.join(root, 'notes.txt'), 'w') as f:
+                f.write("not code\n")
+            with open(os.path.join(root, 'bad.py'), 'wb') as f:
+                f.write(b"x = '\xff'\n")
+            self.assertEqual(len(list(walk_sources(root))), 31)
+
+            output = os.path.join(root, 'out.jsonl')
+            cache = os.path.join(root, '.cache')
+            totals = run_corpus(root, output, workers=2, cache_dir=cache, chunksize=4)
+            self.assertEqual((totals['files'], totals['errors'], totals['cached']), (31, 1, 0))
+            self.assertEqual(totals['total_lines'], sum(i + 2 for i in range(30)))
+            with open(output, encoding='utf-8') as f:
+                entries = [json.loads(line) for line in f]
+            self.assertEqual(len(entries), 31)
+            self.assertIn('UnicodeDecodeError', next(e for e in entries if 'error' in e)['error'])
+
+            again = run_corpus(root, output, workers=2, cache_dir=cache)
+            self.assertEqual(again['cached'], 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import unittest
+
+from latency import LatencyHistogram, LatencyProbe
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.ns = 0
+
+    def __call__(self):
+        return self.ns
+
+    def advance(self, ms):
+        self.ns += int(ms * 1e6)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles(self):
+        hist = LatencyHistogram()
+        self.assertIsNone(hist.percentile(50))
+        for ms in [2.5] * 90 + [17.2] * 9 + [400]:
+            hist.add(ms)
+        self.assertEqual(hist.count, 100)
+        self.assertEqual(hist.percentile(50), 3)
+        self.assertEqual(hist.percentile(95), 18)
+        self.assertEqual(hist.percentile(100), len(hist.counts))
+        self.assertEqual(hist.max_ms, 400)
+
+
+class TestLatencyProbe(unittest.TestCase):
+
+    def test_key_to_apply_and_flip(self):
+        clock = FakeClock()
+        probe = LatencyProbe('gpt', clock=clock)
+        probe.flipped()
+        probe.key_down()
+        clock.advance(1)
+        probe.applied()
+        probe.key_down()
+        clock.advance(2)
+        probe.applied()
+        clock.advance(10)
+        probe.flipped()
+        probe.flipped()
+
+        data = probe.to_dict()
+        self.assertEqual(data['input_to_apply']['count'], 2)
+        self.assertAlmostEqual(data['input_to_apply']['mean_ms'], 1.5)
+        self.assertEqual(data['input_to_photon']['count'], 2)
+        self.assertAlmostEqual(data['input_to_photon']['mean_ms'], 12.5)
+
+    def test_save(self):
+        probe = LatencyProbe('gemini')
+        probe.key_down()
+        probe.applied()
+        probe.flipped()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'latency.json')
+            probe.save(path)
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        self.assertEqual(data['model'], 'gemini')
+        self.assertEqual(sum(data['input_to_photon']['counts']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import tracemalloc
+import unittest
+
+from memprofile import action_churn, game_footprint
+
+
+class TestMemProfile(unittest.TestCase):
+
+    def test_footprint_per_model(self):
+        for model in ('gpt', 'claude', 'gemini'):
+            stats = game_footprint(model, games=4, top=3)
+            # At least one 20x10 board of pointers per game
+            self.assertGreater(stats['bytes_per_game'], 200 * 8, model)
+            self.assertGreater(stats['blocks_per_game'], 0, model)
+            self.assertTrue(0 < len(stats['top_sites']) <= 3)
+            sites = [site['site'] for site in stats['top_sites']]
+            self.assertTrue(all(s.startswith((f"tetris_{model}.py:", "board.py:")) for s in sites))
+            # The settled cells are listed where they are allocated
+            board = "board.py:" if model in ('claude', 'gemini') else f"tetris_{model}.py:"
+            self.assertTrue(any(s.startswith(board) for s in sites), (model, sites))
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_action_churn(self):
+        stats = action_churn('claude', actions=100)
+        self.assertGreater(stats['actions'], 0)
+        self.assertGreater(stats['transient_bytes_per_action'], 0)
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from unittest import mock
+
+import tetris_gpt
+from microbench import BENCHMARKS, CLEARS, compare, gpt_compute_ghost_y, run_benchmark, summarize
+
+
+class TestMicrobench(unittest.TestCase):
+
+    def test_summarize(self):
+        stats = summarize([10.0, 12.0, 11.0, 13.0])
+        self.assertAlmostEqual(stats['mean_ns'], 11.5)
+        lo, hi = stats['ci95_ns']
+        # t(3) = 3.182, stdev 1.29
+        self.assertAlmostEqual(hi - stats['mean_ns'], 3.182 * 1.2910 / 2, places=2)
+        self.assertAlmostEqual(stats['mean_ns'] - lo, hi - stats['mean_ns'])
+
+    def test_compare_needs_threshold_and_separate_intervals(self):
+        def result(mean, half):
+            return {'mean_ns': mean, 'ci95_ns': [mean - half, mean + half]}
+        baseline = {'benchmarks': {'a': result(100, 2), 'b': result(100, 2), 'c': result(100, 30)}}
+        current = {'benchmarks': {'a': result(120, 2), 'b': result(105, 1), 'c': result(120, 30),
+                                  'new': result(1, 0)}}
+        report = compare(current, baseline, threshold=0.1)
+        self.assertEqual(set(report), {'a', 'b', 'c'})
+        self.assertTrue(report['a']['regressed'])
+        self.assertFalse(report['b']['regressed'])   # within threshold
+        self.assertFalse(report['c']['regressed'])   # intervals overlap
+        self.assertAlmostEqual(report['a']['change'], 0.2)
+
+    def test_every_workload_runs(self):
+        for model, benchmarks in BENCHMARKS.items():
+            for name, setup in benchmarks.items():
+                stats = run_benchmark(setup, repeats=2)
+                self.assertGreater(stats['mean_ns'], 0, f"{model}.{name}")
+
+    def test_clear_workloads_time_only_the_clear(self):
+        # Every call clears four full rows of a board prepare() built untimed
+        with mock.patch('tetris_gpt.clear_lines', wraps=tetris_gpt.clear_lines) as clear:
+            calls, run, prepare = BENCHMARKS['gpt']['clear_lines']()
+            for _ in range(2):
+                prepare()
+                run()
+        self.assertEqual(calls, CLEARS)
+        self.assertEqual(clear.call_count, 2 * CLEARS)
+        for model in ('claude', 'gemini'):
+            with mock.patch('board.Board.clear_rows', autospec=True) as clear_rows:
+                calls, run, prepare = BENCHMARKS[model]['Tetris.clear_lines']()
+                prepare()
+                run()
+            self.assertEqual(clear_rows.call_count, CLEARS, model)
+            self.assertTrue(all(len(c.args[1]) == 4 for c in clear_rows.call_args_list), model)
+
+    def test_ghost_workload_computes_landing_rows(self):
+        for cached in (False, True):
+            calls, run = gpt_compute_ghost_y(cached)
+            run()
+            with mock.patch.object(tetris_gpt.Grid, 'landing_row', autospec=True,
+                                   side_effect=tetris_gpt.Grid.landing_row) as landing:
+                run()
+            self.assertEqual(landing.call_count, 0 if cached else calls)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import pygame
+
+from profiler import FrameProfiler, PHASES
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.ns = 0
+
+    def __call__(self):
+        return self.ns
+
+    def advance(self, ms):
+        self.ns += int(ms * 1e6)
+
+
+class TestFrameProfiler(unittest.TestCase):
+
+    def run_frames(self, profiler, clock, frames):
+        for i in range(frames):
+            profiler.start()
+            for phase, ms in zip(PHASES, (1, 2, 3 + i % 10, 4)):
+                clock.advance(ms)
+                profiler.mark(phase)
+            profiler.end_frame()
+
+    def test_ring_keeps_last_frames(self):
+        clock = FakeClock()
+        profiler = FrameProfiler('gpt', frames=8, clock=clock)
+        self.run_frames(profiler, clock, 13)
+        self.assertEqual(profiler.count, 8)
+        self.assertEqual(profiler.frame_times('render'), [3 + i % 10 for i in range(5, 13)])
+        self.assertEqual(profiler.frame_times(), [10 + i % 10 for i in range(5, 13)])
+
+    def test_percentiles(self):
+        clock = FakeClock()
+        profiler = FrameProfiler('claude', frames=100, clock=clock)
+        self.run_frames(profiler, clock, 100)
+        stats = profiler.to_dict()['phases']
+        self.assertEqual(set(stats), set(PHASES) | {'frame'})
+        self.assertEqual(stats['event']['p99_ms'], 1)
+        self.assertEqual(stats['render']['p50_ms'], 8)
+        self.assertEqual(stats['render']['p95_ms'], 12)
+        self.assertEqual(stats['frame']['max_ms'], 19)
+
+    def test_overlay(self):
+        clock = FakeClock()
+        profiler = FrameProfiler('gemini', clock=clock)
+        self.run_frames(profiler, clock, 50)
+        surface = pygame.Surface((200, 100))
+        rect = pygame.Rect(10, 10, 120, 80)
+        self.assertEqual(profiler.draw_overlay(surface, rect), rect)
+        # Newest frame is at the right edge, its event bar at the bottom
+        self.assertEqual(surface.get_at((rect.right - 1, rect.bottom - 1))[:3], (90, 160, 255))
+        self.assertEqual(surface.get_at((rect.left, rect.bottom - 1))[:3], (0, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import random
+import tempfile
+import unittest
+
+from headless import new_game
+from replay import Recording, replay
+
+ACTIONS = {
+    'gpt': ('left', 'right', 'rotate', 'rotate_ccw', 'down', 'drop', 'hold_left',
+            'release_left', 'soft_drop_on', 'soft_drop_off', 'pause', 'restart'),
+    'claude': ('left', 'right', 'rotate', 'down', 'drop', 'restart'),
+    'gemini': ('left', 'right', 'rotate', 'down', 'drop'),
+}
+
+
+def record_game(model, seed, frames=400):
+    game = new_game(model, seed)
+    game.recording = Recording(model, game.seed)
+    rng = random.Random(seed)
+    for _ in range(frames):
+        for _ in range(rng.randrange(3)):
+            game.step(rng.choice(ACTIONS[model]))
+        game.tick(rng.randrange(10, 40))
+    return game
+
+
+class TestReplay(unittest.TestCase):
+
+    def test_replay_matches_final_state(self):
+        for model in ACTIONS:
+            for seed in (1, 2, 3):
+                game = record_game(model, seed)
+                again = replay(game.recording)
+                self.assertEqual(again.grid, game.grid, model)
+                self.assertEqual((again.score, again.lines, again.game_over),
+                                 (game.score, game.lines, game.game_over))
+
+    def test_seeded_games_share_pieces(self):
+        for model in ACTIONS:
+            a, b = new_game(model, 7), new_game(model, 7)
+            for _ in range(30):
+                a.step('drop')
+                b.step('drop')
+            self.assertEqual(a.grid, b.grid)
+
+    def test_save_and_load(self):
+        game = record_game('gpt', 4, frames=50)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'game.json')
+            game.recording.save(path)
+            loaded = Recording.load(path)
+        self.assertEqual(loaded.to_dict(), game.recording.to_dict())
+        self.assertEqual(replay(loaded).grid, game.grid)
+
+    def test_events_are_timestamped(self):
+        recording = Recording('gpt', 0)
+        recording.add_input('left')
+        recording.add_frame(16)
+        recording.add_frame(17)
+        recording.add_input('drop')
+        self.assertEqual(list(recording.events()), [(0, 'left'), (33, 'drop')])
+
+
+if __name__ == '__main__':
+    unittest.main()
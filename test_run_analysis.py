@@ -0,0 +1,22 @@
+import unittest
+
+from run_analysis import format_report, run_suites
+
+
+class TestRunAnalysis(unittest.TestCase):
+
+    def test_suites_run_in_parallel(self):
+        results, wall = run_suites(['claude', 'gemini'])
+        self.assertEqual([r['model'] for r in results], ['claude', 'gemini'])
+        for r in results:
+            self.assertEqual(r['run'], 10)
+            self.assertEqual(len(r['tests']), 10)
+            self.assertEqual((r['failures'], r['errors']), (0, 0))
+            self.assertTrue(all(t['seconds'] >= 0 for t in r['tests']))
+        report = format_report(results, wall)
+        self.assertIn('[claude] 10 tests, 0 failures, 0 errors', report)
+        self.assertIn('Wall time', report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+from selfplay import play_game, run
+
+
+class TestSelfPlay(unittest.TestCase):
+
+    def test_seeded_games_repeat(self):
+        for model in ('gpt', 'claude', 'gemini'):
+            for policy in ('random', 'scripted'):
+                first = play_game(model, 11, policy, max_actions=500)
+                self.assertEqual(play_game(model, 11, policy, max_actions=500), first)
+                self.assertGreater(first[0], 0)
+
+    def test_run_reports_every_model(self):
+        results = run(['gpt', 'gemini'], games=4, workers=2, max_actions=300)
+        self.assertEqual(set(results), {'gpt', 'gemini'})
+        for r in results.values():
+            self.assertEqual(r['games'], 4)
+            self.assertGreater(r['pieces_per_sec'], 0)
+            self.assertGreaterEqual(r['lines'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import random
+import unittest
+from multiprocessing import Pool
+
+from tetris_ai import (TranspositionTable, BeamSearchPlayer, beam_search, board_features, board_masks,
+                       cached_evaluate, evaluate, evaluate_masks, masks_key, place_masks)
+from tetris_gpt import Tetris, BitBoard, COLS, ROWS, create_grid, lock_piece, zobrist_key
+
+
+class TestZobrist(unittest.TestCase):
+
+    def test_incremental_matches_full_hash(self):
+        for bitboard in (False, True):
+            game = Tetris(bitboard=bitboard, seed=6)
+            game.grid[ROWS - 6:] = [['T'] * (COLS - 1) + [None] for _ in range(6)]
+            rng = random.Random(6)
+            for i in range(300):
+                if i % 8 == 0:
+                    game.current.update(letter='I', rot=1, x=COLS - 3)
+                    game.step('drop')
+                else:
+                    game.step(rng.choice(('left', 'right', 'rotate', 'drop')))
+                self.assertEqual(game.grid.zobrist, zobrist_key([list(row) for row in game.grid]))
+            self.assertGreater(game.lines, 0)
+
+    def test_key_covers_pieces(self):
+        grid = create_grid()
+        self.assertEqual(zobrist_key(grid), 0)
+        lock_piece(grid, 'O', 0, 3, ROWS - 3)
+        board = grid.zobrist
+        self.assertNotEqual(board, 0)
+        self.assertNotEqual(zobrist_key(grid, 'T', 'I'), zobrist_key(grid, 'I', 'T'))
+        # Same cells, different letters: same board key
+        other = BitBoard()
+        lock_piece(other, 'O', 0, 3, ROWS - 3)
+        other[ROWS - 1] = ['Z' if c else None for c in other[ROWS - 1]]
+        self.assertEqual(other.zobrist, board)
+
+
+class TestTranspositionTable(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        table = TranspositionTable(capacity=3)
+        for key in range(3):
+            table.store(key, 0, key * 10)
+        self.assertEqual(table.get(0), (0, None))
+        table.store(3, 0, 30)
+        self.assertIsNone(table.get(1))
+        self.assertEqual(len(table), 3)
+        stats = table.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (1, 1, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 0.5)
+        self.assertGreater(stats['memory_bytes'], 0)
+
+    def test_depth_preferred(self):
+        table = TranspositionTable(capacity=3, policy='depth')
+        table.store(1, 3, 'deep', 'move')
+        table.store(2, 0, 'leaf')
+        table.store(3, 1, 'mid')
+        table.store(4, 0, 'new')
+        self.assertEqual(table.get(1, depth=2), ('deep', 'move'))
+        self.assertIsNone(table.get(2))
+        self.assertIsNone(table.get(3, depth=2))
+        # A shallower result never replaces a deeper one
+        table.store(1, 0, 'shallow')
+        self.assertEqual(table.get(1), ('deep', 'move'))
+        with self.assertRaises(ValueError):
+            TranspositionTable(policy='fifo')
+
+    def test_cached_evaluate(self):
+        table = TranspositionTable()
+        grid = create_grid()
+        lock_piece(grid, 'I', 1, -2, ROWS - 4)
+        self.assertEqual(board_features(grid), {'height': 4, 'holes': 0, 'bumpiness': 4})
+        self.assertEqual(board_features([list(row) for row in grid]), board_features(grid))
+        first = cached_evaluate(grid, table, lines=1)
+        self.assertAlmostEqual(first, evaluate(grid, lines=1))
+        self.assertEqual(cached_evaluate(grid, table, lines=1), first)
+        self.assertEqual(table.stats()['hits'], 1)
+
+
+class TestBeamSearch(unittest.TestCase):
+
+    def test_mask_board_matches_grid(self):
+        game = Tetris(bitboard=True, seed=9)
+        rng = random.Random(9)
+        for _ in range(12):
+            masks = board_masks(game.grid)
+            p = rng.choice(game.placements())
+            placed, lines = place_masks(masks, game.current['letter'], p['rot'], p['x'], p['y'])
+            for action in p['path']:
+                game.step(action)
+            self.assertEqual(placed, tuple(game.grid.masks))
+            self.assertEqual(masks_key(placed), game.grid.zobrist)
+            self.assertAlmostEqual(evaluate_masks(placed), evaluate(game.grid))
+        self.assertIsNone(place_masks(board_masks(game.grid), 'I', 1, 0, -3))
+
+    def test_player_clears_lines(self):
+        game = Tetris(seed=1)
+        with BeamSearchPlayer(width=4, workers=1) as player:
+            self.assertEqual(player.play(game, max_pieces=40), 40)
+            stats = player.stats()
+        self.assertFalse(game.game_over)
+        self.assertGreater(game.lines, 5)
+        self.assertEqual(stats['moves'], 40)
+        self.assertGreater(stats['nodes_per_sec'], 0)
+
+    def test_pool_matches_serial(self):
+        # Small width, so the beam prunes: the pool must still pick the same moves
+        rng = random.Random(5)
+        with Pool(2) as pool:
+            for seed in range(3):
+                game = Tetris(bitboard=True, seed=seed)
+                for _ in range(15):
+                    c = game.current
+                    args = (board_masks(game.grid), [c['letter'], game.next_piece],
+                            (c['rot'], c['x'], c['y']), 4, 2)
+                    serial = beam_search(*args)
+                    self.assertEqual(beam_search(*args, mapper=pool.map, chunks=2), serial)
+                    self.assertEqual(beam_search(*args, chunks=3), serial)
+                    p = rng.choice(game.placements())
+                    for action in p['path']:
+                        game.step(action)
+
+    def test_pool_and_time_budget(self):
+        game = Tetris(seed=2)
+        with BeamSearchPlayer(width=4, depth=2, time_budget=0.0, workers=2) as player:
+            self.assertEqual(player.play(game, max_pieces=5), 5)
+            # A spent budget stops after the first ply: one board per root placement
+            self.assertLess(player.stats()['nodes'], 5 * 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import random
+import unittest
+
+import numpy as np
+
+from tetris_gpt import Tetris, COLS, ROWS, bag_generator
+from tetris_batch import BatchTetris, ACTIONS, LETTERS, QUEUE, measure_throughput
+
+# Bottom rows filled except the last column, so drifting pieces clear lines
+PREFILL = [['T'] * (COLS - 1) + [None] for _ in range(6)]
+
+
+class TestBatchTetris(unittest.TestCase):
+
+    def test_matches_scalar_games(self):
+        n = 12
+        seeds = list(range(100, 100 + n))
+        rng = random.Random(9)
+        weights = (2, 5, 2, 1, 2, 2)
+        script = [rng.choices(range(len(ACTIONS)), weights, k=n) for _ in range(600)]
+
+        batch = BatchTetris(n, seeds)
+        batch.boards[:, ROWS - len(PREFILL):, :COLS - 1] = LETTERS.index('T') + 1
+        for actions in script:
+            batch.step(actions)
+
+        for i, seed in enumerate(seeds):
+            game = Tetris(seed=seed)
+            game.grid[ROWS - len(PREFILL):] = [list(row) for row in PREFILL]
+            for actions in script:
+                game.step(ACTIONS[actions[i]])
+
+            self.assertEqual(batch.grid(i), game.grid)
+            self.assertEqual(batch.current(i), game.current)
+            self.assertEqual((batch.score[i], batch.lines[i], batch.level[i], batch.game_over[i]),
+                             (game.score, game.lines, game.level, game.game_over))
+        self.assertGreater(batch.lines.sum(), 0)
+
+    def test_game_over_boards_are_frozen(self):
+        batch = BatchTetris(4, seeds=[1, 2, 3, 4])
+        for _ in range(200):
+            batch.step(np.full(4, ACTIONS.index('drop')))
+        self.assertTrue(batch.game_over.all())
+        before = batch.boards.copy()
+        batch.step(np.full(4, ACTIONS.index('drop')))
+        np.testing.assert_array_equal(batch.boards, before)
+
+    def test_queue_refills_follow_the_bag(self):
+        # Locks past the end of the first queue still deal tetris_gpt's sequence
+        batch = BatchTetris(3, seeds=[5, 6, 7])
+        dealt = [[int(p)] for p in batch.piece]
+        for _ in range(QUEUE + 10):
+            batch._spawn(np.arange(3))
+            for i in range(3):
+                dealt[i].append(int(batch.piece[i]))
+        for seed, pieces in zip([5, 6, 7], dealt):
+            bag = bag_generator(random.Random(seed))
+            expected = [LETTERS.index(next(bag))]
+            next(bag)  # never played, as in Tetris.__init__
+            expected += [LETTERS.index(next(bag)) for _ in range(QUEUE + 10)]
+            self.assertEqual(pieces, expected)
+
+    def test_throughput(self):
+        stats = measure_throughput(n=50, steps=20, scalar_games=5)
+        self.assertGreater(stats['batch_steps_per_sec'], 0)
+        self.assertGreater(stats['scalar_steps_per_sec'], 0)
+        self.assertAlmostEqual(stats['speedup'],
+                               stats['batch_steps_per_sec'] / stats['scalar_steps_per_sec'])
+
+    def test_seed_count(self):
+        with self.assertRaises(ValueError):
+            BatchTetris(3, seeds=[1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import random
+import unittest
+
+import pygame
+
+from tetris_claude import (Tetris, Tetromino, GRID_HEIGHT, GRID_WIDTH, GRID_SIZE, BLACK, GRAY,
+                           PALETTE, SHAPE_COLORS)
+
+
+class TestHeadless(unittest.TestCase):
+
+    def test_no_display_or_fonts(self):
+        pygame.display.quit()
+        game = Tetris(headless=True)
+        self.assertIsNone(game.screen)
+        self.assertIsNone(game.font)
+        self.assertFalse(pygame.display.get_init())
+
+    def test_step_until_game_over(self):
+        game = Tetris(headless=True, seed=1)
+        steps = 0
+        while game.step('drop'):
+            steps += 1
+            self.assertLess(steps, GRID_HEIGHT * 10)
+        self.assertTrue(game.game_over)
+        self.assertFalse(game.step('left'))
+
+    def test_unknown_action(self):
+        game = Tetris(headless=True)
+        with self.assertRaises(ValueError):
+            game.step('jump')
+
+
+class TestSprites(unittest.TestCase):
+
+    def test_draw_grid_matches_rect_drawing(self):
+        game = Tetris(headless=True, seed=2)
+        game.step('drop')
+        game.current_piece = Tetromino('T')
+        game.screen = pygame.Surface((GRID_WIDTH * GRID_SIZE, GRID_HEIGHT * GRID_SIZE))
+        game.draw_grid()
+
+        reference = pygame.Surface(game.screen.get_size())
+        cells = [(x, y, game.grid_colors[y][x] if game.grid[y][x] else BLACK)
+                 for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH)]
+        piece = game.current_piece
+        cells += [(piece.x + j, piece.y + i, piece.color)
+                  for i, row in enumerate(piece.shape) for j, cell in enumerate(row) if cell]
+        for x, y, color in cells:
+            rect = pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+            pygame.draw.rect(reference, color, rect)
+            pygame.draw.rect(reference, GRAY, rect, 1)
+        self.assertEqual(pygame.image.tobytes(game.screen, 'RGB'),
+                         pygame.image.tobytes(reference, 'RGB'))
+
+
+class TestColumnHeights(unittest.TestCase):
+
+    def play(self, game, loop_drop):
+        rng = random.Random(game.seed)
+        for _ in range(400):
+            action = rng.choice(('left', 'right', 'rotate', 'down', 'drop', 'drop'))
+            if action == 'drop' and loop_drop:
+                if not game.game_over:
+                    while game.move_down():
+                        game.score += 2
+            else:
+                game.step(action)
+        return game
+
+    def test_hard_drop_matches_row_walk(self):
+        for seed in range(5):
+            fast = self.play(Tetris(headless=True, seed=seed), loop_drop=False)
+            slow = self.play(Tetris(headless=True, seed=seed), loop_drop=True)
+            self.assertEqual(fast.grid, slow.grid)
+            self.assertEqual((fast.score, fast.lines), (slow.score, slow.lines))
+
+    def test_heights_follow_play(self):
+        game = Tetris(headless=True, seed=3)
+        for y in range(GRID_HEIGHT - 6, GRID_HEIGHT):
+            game.grid[y] = [1] * (GRID_WIDTH - 1) + [0]
+        game.rebuild_heights()
+        rng = random.Random(3)
+        for i in range(300):
+            if i % 10 == 0:
+                # Vertical I into the open column
+                game.current_piece = Tetromino('I')
+                game.current_piece.shape = [[1], [1], [1], [1]]
+                game.current_piece.x = GRID_WIDTH - 1
+                game.step('drop')
+            else:
+                game.step(rng.choice(('left', 'right', 'rotate', 'drop')))
+            heights = list(game.heights)
+            game.rebuild_heights()
+            self.assertEqual(heights, game.heights)
+        self.assertGreater(game.lines, 0)
+        self.assertEqual(len(game.surface()), GRID_WIDTH - 1)
+
+    def test_hard_drop_after_direct_row_writes(self):
+        game = Tetris(headless=True, seed=1)
+        for y in (GRID_HEIGHT - 2, GRID_HEIGHT - 1):
+            game.grid[y] = [1] * (GRID_WIDTH - 1) + [0]
+        game.current_piece = Tetromino('O')
+        game.hard_drop()
+        x = GRID_WIDTH // 2 - 1
+        self.assertEqual([game.grid[y][x] for y in range(GRID_HEIGHT - 4, GRID_HEIGHT)], [2, 2, 1, 1])
+
+    def test_row_fill_follows_play(self):
+        game = Tetris(headless=True, seed=5)
+        rng = random.Random(5)
+        for _ in range(300):
+            game.step(rng.choice(('left', 'right', 'rotate', 'drop')))
+            self.assertEqual(game.row_fill, [sum(1 for cell in row if cell) for row in game.grid])
+
+    def test_clear_only_checks_given_rows(self):
+        game = Tetris(headless=True)
+        game.grid[GRID_HEIGHT - 1] = [1] * GRID_WIDTH
+        game.rebuild_heights()
+        game.clear_lines({GRID_HEIGHT - 2})
+        self.assertEqual(game.lines, 0)
+        game.clear_lines({GRID_HEIGHT - 1})
+        self.assertEqual(game.lines, 1)
+        self.assertEqual(game.row_fill, [0] * GRID_HEIGHT)
+
+
+class TestBoard(unittest.TestCase):
+
+    def test_cell_writes_reach_the_board(self):
+        game = Tetris(headless=True, seed=6)
+        for x in range(GRID_WIDTH):
+            game.grid[GRID_HEIGHT - 1][x] = 1
+        game.grid[GRID_HEIGHT - 3][0] = 4
+        self.assertEqual(game.row_fill[GRID_HEIGHT - 1], GRID_WIDTH)
+        self.assertEqual(game.heights[0], 3)
+        self.assertEqual(game.grid_colors[GRID_HEIGHT - 3][0], PALETTE[4])
+        game.clear_lines()
+        self.assertEqual(game.lines, 1)
+        self.assertEqual(game.grid[GRID_HEIGHT - 2][0], 4)
+        self.assertEqual(game.heights, [2] + [0] * (GRID_WIDTH - 1))
+
+    def test_colors_follow_locked_pieces(self):
+        game = Tetris(headless=True, seed=4)
+        rng = random.Random(4)
+        shadow = [[BLACK] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
+        for _ in range(200):
+            piece = game.current_piece
+            before = game.pieces
+            game.step(rng.choice(('left', 'right', 'rotate', 'drop')))
+            if game.pieces != before and not game.lines:
+                for i, row in enumerate(piece.shape):
+                    for j, cell in enumerate(row):
+                        if cell and piece.y + i >= 0:
+                            shadow[piece.y + i][piece.x + j] = SHAPE_COLORS[piece.shape_name]
+                self.assertEqual(game.grid_colors, shadow)
+        self.assertTrue(all((c == BLACK) == (not game.grid[y][x])
+                            for y, row in enumerate(game.grid_colors) for x, c in enumerate(row)))
+
+
+if __name__ == '__main__':
+    unittest.main()
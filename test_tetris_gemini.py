@@ -0,0 +1,97 @@
+import unittest
+
+import pygame
+
+from tetris_gemini import (Tetris, Tetromino, BOARD_WIDTH, BOARD_HEIGHT, GRID_SIZE, PALETTE, RED, WHITE, SHAPES,
+                           draw_grid, draw_piece)
+
+
+class TestHeadless(unittest.TestCase):
+
+    def setUp(self):
+        self.game = Tetris(BOARD_WIDTH, BOARD_HEIGHT, seed=1)
+
+    def test_step_spawns_piece(self):
+        self.assertIsNone(self.game.current_piece)
+        self.game.step('left')
+        self.assertIsNotNone(self.game.current_piece)
+
+    def test_drop_locks_piece(self):
+        self.game.step('rotate')
+        piece = self.game.current_piece
+        self.game.step('drop')
+        self.assertIsNot(self.game.current_piece, piece)
+        self.assertTrue(any(self.game.grid[BOARD_HEIGHT - 1]))
+
+    def test_step_until_game_over(self):
+        steps = 0
+        while self.game.step('drop'):
+            steps += 1
+            self.assertLess(steps, BOARD_HEIGHT * 10)
+        self.assertTrue(self.game.game_over)
+
+    def test_row_fill_follows_play(self):
+        for action in ('left', 'drop', 'rotate', 'right', 'right', 'drop', 'drop', 'left', 'drop'):
+            self.game.step(action)
+            self.assertEqual(self.game.row_fill,
+                             [sum(1 for cell in row if cell) for row in self.game.grid])
+
+    def test_cell_writes_count_towards_clears(self):
+        for x in range(BOARD_WIDTH):
+            self.game.grid[BOARD_HEIGHT - 1][x] = RED
+        self.assertEqual(self.game.row_fill[BOARD_HEIGHT - 1], BOARD_WIDTH)
+        self.game.clear_lines({BOARD_HEIGHT - 1})
+        self.assertEqual(self.game.lines, 1)
+        self.assertFalse(any(self.game.grid[BOARD_HEIGHT - 1]))
+
+    def test_clear_compacts_in_order(self):
+        grid = self.game.grid
+        grid[BOARD_HEIGHT - 3] = [1] * BOARD_WIDTH
+        grid[BOARD_HEIGHT - 2] = [2] + [0] * (BOARD_WIDTH - 1)
+        grid[BOARD_HEIGHT - 1] = [1] * BOARD_WIDTH
+        self.game.clear_lines()
+        self.assertEqual(self.game.lines, 2)
+        self.assertEqual(grid[BOARD_HEIGHT - 1], [2] + [0] * (BOARD_WIDTH - 1))
+        self.assertFalse(any(grid[BOARD_HEIGHT - 2]))
+
+    def test_board_holds_piece_ids(self):
+        for action in ('drop', 'left', 'drop', 'rotate', 'drop'):
+            self.game.step(action)
+        ids = {cell for row in self.game.grid for cell in row}
+        self.assertTrue(ids <= set(range(len(PALETTE))))
+        self.assertGreater(len(ids), 1)
+        # Colours written directly are stored as their palette id
+        self.game.grid[0] = [RED] * BOARD_WIDTH
+        self.assertEqual(self.game.grid[0], [PALETTE.index(RED)] * BOARD_WIDTH)
+        with self.assertRaisesRegex(ValueError, 'not in the board palette'):
+            self.game.grid[1] = [WHITE] * BOARD_WIDTH
+        with self.assertRaises(ValueError):
+            self.game.grid[1] = [1] * (BOARD_WIDTH - 1)
+        self.assertEqual(len(self.game.grid.cells), BOARD_WIDTH * BOARD_HEIGHT)
+        piece = Tetromino(0, 0, [list(row) for row in SHAPES[2]])
+        self.assertEqual((piece.id, piece.color), (3, PALETTE[3]))
+
+
+class TestSprites(unittest.TestCase):
+
+    def test_blits_match_rect_drawing(self):
+        game = Tetris(BOARD_WIDTH, BOARD_HEIGHT, seed=4)
+        for action in ('drop', 'left', 'drop', 'rotate', 'right', 'drop', 'down'):
+            game.step(action)
+        size = (BOARD_WIDTH * GRID_SIZE, BOARD_HEIGHT * GRID_SIZE)
+        surface = pygame.Surface(size)
+        draw_grid(surface, game.grid)
+        draw_piece(surface, game.current_piece)
+
+        reference = pygame.Surface(size)
+        piece = game.current_piece
+        cells = [(x, y, PALETTE[c]) for y, row in enumerate(game.grid) for x, c in enumerate(row) if c]
+        cells += [(piece.x + x, piece.y + y, piece.color)
+                  for y, row in enumerate(piece.shape) for x, c in enumerate(row) if c]
+        for x, y, color in cells:
+            pygame.draw.rect(reference, color, (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE - 1, GRID_SIZE - 1))
+        self.assertEqual(pygame.image.tobytes(surface, 'RGB'), pygame.image.tobytes(reference, 'RGB'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,376 @@
+import copy
+import pickle
+import random
+import unittest
+
+import pygame
+
+from tetris_gpt import (Tetris, BitBoard, GridRenderer, PIECES, COLORS, COLS, ROWS, BORDER, CELL,
+                        PLAY_W, PLAY_H, BLACK, create_grid, valid_position, lock_piece,
+                        clear_lines, draw_grid, draw_ghost, draw_current, draw_cell, draw_preview,
+                        paint_cell, paint_preview, build_atlas, compute_ghost_y,
+                        enumerate_placements, get_piece_shape, zobrist_key, KICK_TESTS, SPAWN_X, SPAWN_Y)
+
+
+class TestBitBoard(unittest.TestCase):
+
+    def test_valid_position_matches_list_grid(self):
+        rng = random.Random(7)
+        grid = create_grid()
+        board = BitBoard()
+        for y in range(ROWS // 2, ROWS):
+            for x in range(COLS):
+                if rng.random() < 0.4:
+                    grid[y][x] = 'T'
+            board[y] = list(grid[y])
+
+        for letter in PIECES:
+            for rot in range(4):
+                for px in range(-4, COLS + 1):
+                    for py in range(-3, ROWS + 1):
+                        self.assertEqual(valid_position(board, letter, rot, px, py),
+                                         valid_position(grid, letter, rot, px, py))
+
+    def test_lock_and_clear(self):
+        board = BitBoard()
+        board[ROWS - 1] = ['I'] * (COLS - 4) + [None] * 4
+        lock_piece(board, 'I', 0, COLS - 4, ROWS - 3)
+
+        self.assertEqual(board[ROWS - 1][COLS - 1], 'I')
+        self.assertEqual(clear_lines(board), 1)
+        self.assertEqual(board.masks[ROWS - 1], 0)
+        self.assertTrue(all(cell is None for row in board for cell in row))
+
+    def test_game_matches_list_backend(self):
+        games = []
+        for bitboard in (False, True):
+            game = Tetris(bitboard=bitboard, seed=42)
+            rng = random.Random(3)
+            for _ in range(400):
+                if game.game_over:
+                    break
+                action = rng.randrange(4)
+                if action == 0:
+                    game.rotate(cw=rng.random() < 0.5)
+                elif action == 1:
+                    game.shift(rng.choice((-1, 1)))
+                elif action == 2:
+                    game.drop_one()
+                else:
+                    game.hard_drop()
+            games.append(game)
+
+        plain, bits = games
+        self.assertEqual([list(row) for row in bits.grid], plain.grid)
+        self.assertEqual((bits.score, bits.lines, bits.game_over),
+                         (plain.score, plain.lines, plain.game_over))
+
+
+class TestGhostCache(unittest.TestCase):
+
+    def random_board(self, board, seed):
+        rng = random.Random(seed)
+        for y in range(ROWS // 3, ROWS):
+            board[y] = [rng.choice('IOT') if rng.random() < 0.35 else None for _ in range(COLS)]
+        return board
+
+    def test_matches_row_scan(self):
+        for board in (self.random_board(create_grid(), 1), self.random_board(BitBoard(), 2)):
+            plain = [list(row) for row in board]
+            for letter in PIECES:
+                for rot in range(4):
+                    for px in range(-3, COLS):
+                        for py in range(-4, ROWS):
+                            if not valid_position(plain, letter, rot, px, py):
+                                continue
+                            self.assertEqual(compute_ghost_y(board, letter, rot, px, py),
+                                             compute_ghost_y(plain, letter, rot, px, py))
+
+    def test_version_invalidates_cache(self):
+        grid = create_grid()
+        self.assertEqual(compute_ghost_y(grid, 'O', 0, 3, -2), ROWS - 3)
+        version = grid.version
+        lock_piece(grid, 'O', 0, 3, ROWS - 3)
+        self.assertGreater(grid.version, version)
+        self.assertEqual(compute_ghost_y(grid, 'O', 0, 3, -2), ROWS - 5)
+        grid[ROWS - 6] = ['T'] * COLS
+        self.assertEqual(compute_ghost_y(grid, 'O', 0, 3, -2), ROWS - 9)
+        self.assertEqual(clear_lines(grid), 1)
+        self.assertEqual(compute_ghost_y(grid, 'O', 0, 3, -2), ROWS - 5)
+
+
+class TestColumnHeights(unittest.TestCase):
+
+    def test_heights_follow_play(self):
+        for bitboard in (False, True):
+            game = Tetris(bitboard=bitboard, seed=8)
+            game.grid[ROWS - 8:] = [['T'] * (COLS - 1) + [None] for _ in range(8)]
+            rng = random.Random(8)
+            for i in range(300):
+                if i % 10 == 0:
+                    # Vertical I into the open column
+                    game.current.update(letter='I', rot=1, x=COLS - 3)
+                    game.step('drop')
+                else:
+                    game.step(rng.choice(('left', 'right', 'rotate', 'drop', 'drop')))
+                tops = [next((ROWS - y for y in range(ROWS) if game.grid[y][x] is not None), 0)
+                        for x in range(COLS)]
+                self.assertEqual(game.grid.heights, tops)
+            self.assertGreater(game.lines, 0)
+
+    def test_surface_profile(self):
+        grid = create_grid()
+        lock_piece(grid, 'I', 1, -2, ROWS - 4)
+        lock_piece(grid, 'O', 0, 1, ROWS - 3)
+        self.assertEqual(grid.heights[:4], [4, 0, 2, 2])
+        self.assertEqual(grid.surface()[:3], [-4, 2, 0])
+        self.assertEqual(grid.landing_row('O', 0, 1), ROWS - 5)
+        self.assertIsNone(grid.landing_row('O', 0, -2))
+
+
+class TestRowFill(unittest.TestCase):
+
+    def test_fill_follows_play(self):
+        for bitboard in (False, True):
+            game = Tetris(bitboard=bitboard, seed=4)
+            game.grid[ROWS - 6:] = [['T'] * (COLS - 1) + [None] for _ in range(6)]
+            rng = random.Random(4)
+            for i in range(300):
+                if i % 8 == 0:
+                    game.current.update(letter='I', rot=1, x=COLS - 3)
+                    game.step('drop')
+                else:
+                    game.step(rng.choice(('left', 'right', 'rotate', 'drop')))
+                self.assertEqual(game.grid.fill,
+                                 [sum(cell is not None for cell in row) for row in game.grid])
+            self.assertGreater(game.lines, 0)
+
+    def test_cell_writes_keep_counters(self):
+        for bitboard in (False, True):
+            game = Tetris(bitboard=bitboard, seed=2)
+            grid = game.grid
+            for x in range(COLS):
+                grid[ROWS - 1][x] = 'T'
+            for x in range(COLS - 1):
+                grid[ROWS - 2][x] = 'T'
+            self.assertEqual(grid.fill[ROWS - 2:], [COLS - 1, COLS])
+            self.assertEqual(grid.heights, [2] * (COLS - 1) + [1])
+            self.assertEqual(compute_ghost_y(grid, 'O', 0, 3, -2), ROWS - 5)
+            self.assertEqual(clear_lines(grid), 1)
+            self.assertEqual(grid.fill[ROWS - 1], COLS - 1)
+            # Hard drop stacks on the written cells instead of falling through
+            game.current.update(letter='O', rot=0, x=3, y=SPAWN_Y)
+            game.step('drop')
+            self.assertEqual([grid[ROWS - 3][4], grid[ROWS - 2][4]], ['O', 'O'])
+            self.assertEqual(grid.fill, [sum(c is not None for c in row) for row in grid])
+            self.assertEqual(grid.zobrist, zobrist_key([list(row) for row in grid]))
+            with self.assertRaises(ValueError):
+                grid[0] = [None] * (COLS - 1)
+            with self.assertRaises(TypeError):
+                grid[0].append(None)
+
+    def test_copy_and_pickle(self):
+        for grid in (create_grid(), BitBoard()):
+            lock_piece(grid, 'O', 0, 3, ROWS - 3)
+            grid[ROWS - 5][0] = 'T'
+            for other in (copy.deepcopy(grid), pickle.loads(pickle.dumps(grid))):
+                self.assertIs(type(other), type(grid))
+                self.assertEqual(other, grid)
+                self.assertEqual((other.fill, other.heights, other.zobrist),
+                                 (grid.fill, grid.heights, grid.zobrist))
+                # The copy is independent and keeps its own counters
+                other[ROWS - 1][0] = 'I'
+                self.assertIsNone(grid[ROWS - 1][0])
+                self.assertEqual(other.fill[ROWS - 1], 3)
+
+    def test_rows_cannot_be_added_or_removed(self):
+        grid = create_grid()
+        with self.assertRaises(TypeError):
+            del grid[ROWS - 1]
+        with self.assertRaises(TypeError):
+            grid.insert(0, [None] * COLS)
+        self.assertEqual(len(grid), ROWS)
+        grid[ROWS - 1][0] = 'T'
+        grid.reverse()
+        self.assertEqual((grid.fill[0], grid.heights[0]), (1, ROWS))
+
+    def test_clear_keeps_row_order(self):
+        grid = create_grid()
+        grid[ROWS - 4:] = [['T'] * COLS, ['O'] + [None] * (COLS - 1),
+                           ['T'] * COLS, [None] * (COLS - 1) + ['S']]
+        self.assertEqual(clear_lines(grid), 2)
+        self.assertEqual(grid[ROWS - 2][0], 'O')
+        self.assertEqual(grid[ROWS - 1][COLS - 1], 'S')
+        self.assertEqual(grid.fill[ROWS - 4:], [0, 0, 1, 1])
+        self.assertEqual(clear_lines(grid), 0)
+
+
+def reference_placements(grid, letter):
+    # Plain BFS over (rot, x, y) with valid_position; set of resting cell sets
+    start = (0, SPAWN_X, SPAWN_Y)
+    seen = {start}
+    queue = [start]
+    resting = set()
+    for rot, x, y in queue:
+        if not valid_position(grid, letter, rot, x, y + 1):
+            resting.add(frozenset((x + dx, y + dy) for dx, dy in get_piece_shape(letter, rot)))
+        nxt = [(rot, x - 1, y), (rot, x + 1, y), (rot, x, y + 1)]
+        for nr in ((rot + 1) % 4, (rot - 1) % 4):
+            for dx, dy in KICK_TESTS:
+                if valid_position(grid, letter, nr, x + dx, y + dy):
+                    nxt.append((nr, x + dx, y + dy))
+                    break
+        for state in nxt:
+            if state not in seen and state[2] >= -4 and valid_position(grid, letter, *state):
+                seen.add(state)
+                queue.append(state)
+    return resting
+
+
+class TestPlacements(unittest.TestCase):
+
+    def random_board(self, seed):
+        rng = random.Random(seed)
+        board = BitBoard()
+        for y in range(ROWS // 2, ROWS):
+            board[y] = [None if rng.random() < 0.3 else 'T' for _ in range(COLS)]
+        return board
+
+    def test_empty_board_counts(self):
+        counts = {letter: len(enumerate_placements(create_grid(), letter)) for letter in PIECES}
+        self.assertEqual(counts, {'I': 17, 'O': 9, 'T': 34, 'S': 17, 'Z': 17, 'J': 34, 'L': 34})
+
+    def test_matches_brute_force(self):
+        for seed in range(3):
+            board = self.random_board(seed)
+            for grid in (board, [list(row) for row in board]):
+                for letter in PIECES:
+                    found = enumerate_placements(grid, letter)
+                    cells = [frozenset((p['x'] + dx, p['y'] + dy)
+                                       for dx, dy in get_piece_shape(letter, p['rot'])) for p in found]
+                    self.assertEqual(len(cells), len(set(cells)))
+                    self.assertEqual(set(cells), reference_placements(grid, letter))
+
+    def test_paths_reach_placement(self):
+        game = Tetris(seed=2)
+        for seed in range(4):
+            board = self.random_board(seed)
+            for p in enumerate_placements(board, game.current['letter']):
+                trial = Tetris(seed=2)
+                trial.grid[:] = [list(row) for row in board]
+                for action in p['path']:
+                    trial.step(action)
+                self.assertEqual(trial.pieces, 1)
+                expected = [list(row) for row in board]
+                lock_piece(expected, game.current['letter'], p['rot'], p['x'], p['y'])
+                clear_lines(expected)
+                self.assertEqual([list(row) for row in trial.grid], expected)
+        self.assertEqual(len(game.placements()), 34 if game.current['letter'] in 'TJL' else
+                         9 if game.current['letter'] == 'O' else 17)
+
+
+class TestHeadless(unittest.TestCase):
+
+    def test_step_moves_and_rotates(self):
+        game = Tetris(seed=5)
+        x = game.current['x']
+        game.step('left')
+        self.assertEqual(game.current['x'], x - 1)
+        game.step('right')
+        self.assertEqual(game.current['x'], x)
+        game.step('rotate')
+        self.assertEqual(game.current['rot'], 1)
+        game.step('rotate_ccw')
+        self.assertEqual(game.current['rot'], 0)
+
+    def test_held_key_auto_repeats(self):
+        game = Tetris(seed=5)
+        x = game.current['x']
+        game.step('hold_left')
+        self.assertEqual(game.current['x'], x - 1)
+        # Past the 130 ms repeat delay: one more shift, then one per 40 ms
+        game.tick(200)
+        self.assertEqual(game.current['x'], x - 2)
+        for _ in range(8):
+            game.tick(40)
+        c = game.current
+        self.assertEqual(min(c['x'] + bx for bx, _ in PIECES[c['letter']][c['rot']]), 0)
+        game.step('release_left')
+        game.step('right')
+        game.tick(300)
+        self.assertEqual(min(c['x'] + bx for bx, _ in PIECES[c['letter']][c['rot']]), 1)
+
+    def test_step_until_game_over(self):
+        game = Tetris(seed=5)
+        steps = 0
+        while game.step('drop'):
+            steps += 1
+            self.assertLess(steps, ROWS * 10)
+        self.assertTrue(game.game_over)
+        with self.assertRaises(ValueError):
+            game.step('jump')
+
+
+class TestGridRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.game = Tetris(seed=3)
+        self.surface = pygame.Surface((BORDER * 2 + PLAY_W, BORDER * 2 + PLAY_H))
+        self.renderer = GridRenderer(self.surface)
+
+    def full_frame(self):
+        reference = pygame.Surface(self.surface.get_size())
+        c = self.game.current
+        draw_grid(reference, self.game.grid)
+        draw_ghost(reference, self.game.grid, c['letter'], c['rot'], c['x'], c['y'])
+        draw_current(reference, c['letter'], c['rot'], c['x'], c['y'])
+        return pygame.image.tobytes(reference, 'RGB')
+
+    def test_first_render_is_full(self):
+        dirty = self.renderer.render(self.game.grid, self.game.current)
+        self.assertEqual(dirty, [pygame.Rect(BORDER, BORDER, PLAY_W, PLAY_H)])
+        self.assertEqual(self.renderer.render(self.game.grid, self.game.current), [])
+
+    def test_only_changed_cells_redrawn(self):
+        self.renderer.render(self.game.grid, self.game.current)
+        self.game.step('down')
+        self.game.step('down')
+        self.game.step('down')
+        dirty = self.renderer.render(self.game.grid, self.game.current)
+        self.assertTrue(0 < len(dirty) <= 8)
+        self.assertTrue(all(r.size == (CELL, CELL) for r in dirty))
+
+    def test_matches_full_redraw(self):
+        self.renderer.render(self.game.grid, self.game.current)
+        for action in ('left', 'rotate', 'drop', 'right', 'right', 'drop', 'rotate'):
+            self.game.step(action)
+            self.renderer.render(self.game.grid, self.game.current)
+        self.assertEqual(pygame.image.tobytes(self.surface, 'RGB'), self.full_frame())
+
+
+class TestAtlas(unittest.TestCase):
+
+    def test_sprites_match_direct_drawing(self):
+        build_atlas()
+        for letter, color in COLORS.items():
+            for ghost in (False, True):
+                blitted = pygame.Surface((CELL * 2, CELL * 2))
+                painted = pygame.Surface((CELL * 2, CELL * 2))
+                draw_cell(blitted, 0, 0, color, ghost)
+                paint_cell(painted, pygame.Rect(BORDER, BORDER, CELL, CELL), color, ghost)
+                self.assertEqual(pygame.image.tobytes(blitted, 'RGB'),
+                                 pygame.image.tobytes(painted, 'RGB'))
+
+            # Preview boxes sit on the HUD panel, which is always cleared to BLACK
+            blitted = pygame.Surface((200, 200))
+            painted = pygame.Surface((200, 200))
+            blitted.fill(BLACK)
+            painted.fill(BLACK)
+            draw_preview(blitted, letter, 30, 40)
+            paint_preview(painted, letter, 30, 40)
+            self.assertEqual(pygame.image.tobytes(blitted, 'RGB'),
+                             pygame.image.tobytes(painted, 'RGB'))
+
+
+if __name__ == '__main__':
+    unittest.main()
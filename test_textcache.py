@@ -0,0 +1,41 @@
+import unittest
+
+import pygame
+
+import textcache
+from textcache import get_font, render_text
+
+
+class TestTextCache(unittest.TestCase):
+
+    def setUp(self):
+        pygame.font.init()
+        textcache.clear()
+
+    def test_fonts_created_once(self):
+        self.assertIs(get_font(None, 36), get_font(None, 36))
+        self.assertIsNot(get_font(None, 36), get_font(None, 24))
+        self.assertTrue(get_font(None, 24, bold=True).get_bold())
+
+    def test_text_rendered_once_per_key(self):
+        font = get_font(None, 36)
+        score = render_text(font, "Score: 10", (255, 255, 255))
+        self.assertIs(render_text(font, "Score: 10", (255, 255, 255)), score)
+        self.assertIsNot(render_text(font, "Score: 10", (255, 0, 0)), score)
+        self.assertIsNot(render_text(font, "Score: 20", (255, 255, 255)), score)
+
+    def test_lru_eviction(self):
+        font = get_font(None, 24)
+        first = render_text(font, "0", (255, 255, 255))
+        for i in range(1, textcache.TEXT_CACHE_SIZE):
+            render_text(font, str(i), (255, 255, 255))
+        # Touching "0" keeps it alive while the next insert evicts "1"
+        self.assertIs(render_text(font, "0", (255, 255, 255)), first)
+        render_text(font, "new", (255, 255, 255))
+        self.assertEqual(len(textcache._texts), textcache.TEXT_CACHE_SIZE)
+        self.assertNotIn((font, "1", (255, 255, 255), True), textcache._texts)
+        self.assertIn((font, "0", (255, 255, 255), True), textcache._texts)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+from throughput import format_throughput, measure_throughput
+
+
+class TestThroughput(unittest.TestCase):
+
+    def test_every_model_measured(self):
+        for model in ('gpt', 'claude', 'gemini'):
+            stats = measure_throughput(model, games=2)
+            self.assertGreater(stats['actions'], 0, model)
+            self.assertGreater(stats['locks'], 0, model)
+            # Every lock runs clear_lines exactly once
+            self.assertEqual(stats['clear_lines_calls'], stats['locks'], model)
+            self.assertGreater(stats['clear_lines_mean_us'], 0, model)
+            self.assertAlmostEqual(stats['ms_per_game'], stats['seconds'] / 2 * 1000)
+            self.assertEqual(len(format_throughput(stats)), 4)
+
+    def test_workload_is_seeded(self):
+        first, second = measure_throughput('gpt', games=3), measure_throughput('gpt', games=3)
+        self.assertEqual((first['actions'], first['locks']), (second['actions'], second['locks']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import random
+import unittest
+
+from headless import MODELS, new_game
+from timestep import FixedTimestep
+
+
+class TestFixedTimestep(unittest.TestCase):
+
+    def test_accumulates_partial_frames(self):
+        scheduler = FixedTimestep(hz=100)
+        self.assertEqual(scheduler.step_ms, 10)
+        self.assertEqual(scheduler.advance(7), 0)
+        self.assertAlmostEqual(scheduler.alpha, 0.7)
+        self.assertEqual(scheduler.advance(7), 1)
+        self.assertEqual(scheduler.advance(26), 3)
+        self.assertEqual(scheduler.accumulator, 0)
+
+    def test_catch_up_cap(self):
+        scheduler = FixedTimestep(hz=100, max_steps=4)
+        self.assertEqual(scheduler.advance(1005), 4)
+        self.assertEqual(scheduler.dropped_ms, 960)
+        self.assertEqual(scheduler.accumulator, 5)
+        with self.assertRaises(ValueError):
+            FixedTimestep(hz=0)
+
+    def test_run_calls_tick_per_step(self):
+        scheduler = FixedTimestep(hz=50)
+        ticks = []
+        self.assertEqual(scheduler.run(45, ticks.append), 2)
+        self.assertEqual(ticks, [20, 20])
+
+    def test_game_time_independent_of_frame_rate(self):
+        for model in MODELS:
+            games = []
+            for frame_ms in (7, 16, 33):
+                game = new_game(model, 11)
+                scheduler = FixedTimestep()
+                rng = random.Random(11)
+                steps = []
+
+                def tick(dt_ms):
+                    # Same inputs at the same game times, whatever the frame length
+                    if len(steps) == 1900:
+                        return
+                    steps.append(dt_ms)
+                    if len(steps) % 37 == 0 and not game.game_over:
+                        game.step(rng.choice(('left', 'right', 'rotate')))
+                    game.tick(dt_ms)
+
+                for _ in range(20000 // frame_ms):
+                    scheduler.run(frame_ms, tick)
+                games.append(game)
+            self.assertEqual(games[0].grid, games[1].grid, model)
+            self.assertEqual(games[0].grid, games[2].grid, model)
+
+
+if __name__ == '__main__':
+    unittest.main()
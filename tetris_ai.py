@@ -0,0 +1,372 @@
+import argparse
+import os
+import sys
+import time
+from collections import OrderedDict
+from multiprocessing import Pool
+
+from tetris_gpt import (COLS, ROWS, FULL_ROW, ROW_MASKS, ZOBRIST_CELLS, SPAWN_X, SPAWN_Y,
+                        Grid, BitBoard, Tetris, enumerate_placements)
+
+# ----------------------------
+# Search support for tetris_gpt bots
+# ----------------------------
+# Board evaluation plus a bounded transposition table keyed by the Zobrist
+# keys tetris_gpt keeps on its grids (Grid.zobrist, zobrist_key()), so a
+# search that reaches the same board twice reuses the first result; and a
+# beam-search player that spreads each ply's node expansion over a process
+# pool in one batch per worker.
+
+TT_CAPACITY = 1 << 16
+EVICT_WINDOW = 8  # depth-preferred eviction looks at this many oldest entries
+BEAM_WIDTH = 16
+BEAM_DEPTH = 2    # current piece + the next_piece preview
+
+# Heuristic weights (per unit of each board feature)
+WEIGHTS = {'height': -0.51, 'holes': -0.36, 'bumpiness': -0.18, 'lines': 0.76}
+
+
+def board_features(grid):
+    """Aggregate height, holes and bumpiness of a tetris_gpt grid."""
+    if isinstance(grid, Grid):
+        heights = grid.heights
+        filled = sum(grid.fill)
+    else:
+        heights = [next((ROWS - y for y in range(ROWS) if grid[y][x] is not None), 0)
+                   for x in range(COLS)]
+        filled = sum(cell is not None for row in grid for cell in row)
+    height = sum(heights)
+    return {'height': height,
+            'holes': height - filled,  # empty cells under a column's top block
+            'bumpiness': sum(abs(heights[x + 1] - heights[x]) for x in range(COLS - 1))}
+
+
+def evaluate(grid, lines=0):
+    features = board_features(grid)
+    return (WEIGHTS['height'] * features['height'] + WEIGHTS['holes'] * features['holes']
+            + WEIGHTS['bumpiness'] * features['bumpiness'] + WEIGHTS['lines'] * lines)
+
+
+class TranspositionTable:
+    """Bounded key -> (depth, value, best move) cache.
+
+    policy='lru' evicts the least recently used entry. policy='depth' looks at
+    the EVICT_WINDOW least recently used entries and evicts the shallowest, so
+    results of deeper searches outlive quick leaf evaluations.
+    """
+
+    def __init__(self, capacity=TT_CAPACITY, policy='lru'):
+        if policy not in ('lru', 'depth'):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, depth=0):
+        """(value, best move) stored for key at depth or deeper, else None."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < depth:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def store(self, key, depth, value, move=None):
+        entries = self._entries
+        old = entries.get(key)
+        if old is not None:
+            if old[0] > depth:
+                return
+            entries.move_to_end(key)
+        elif len(entries) >= self.capacity:
+            self._evict()
+        entries[key] = (depth, value, move)
+
+    def _evict(self):
+        entries = self._entries
+        if self.policy == 'lru':
+            entries.popitem(last=False)
+        else:
+            victim = None
+            for i, (key, entry) in enumerate(entries.items()):
+                if i == EVICT_WINDOW:
+                    break
+                if victim is None or entry[0] < entries[victim][0]:
+                    victim = key
+            del entries[victim]
+        self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        memory = sys.getsizeof(self._entries) + sum(
+            sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(entry[1])
+            for key, entry in self._entries.items())
+        return {'entries': len(self._entries), 'capacity': self.capacity, 'policy': self.policy,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0, 'memory_bytes': memory}
+
+
+def cached_evaluate(grid, table, lines=0):
+    """evaluate() with the board part cached in table under the grid's Zobrist key."""
+    hit = table.get(grid.zobrist)
+    if hit is None:
+        value = evaluate(grid)
+        table.store(grid.zobrist, 0, value)
+    else:
+        value = hit[0]
+    return value + WEIGHTS['lines'] * lines
+
+
+# ----------------------------
+# Beam search on row bitmasks
+# ----------------------------
+# Search nodes are boards as tuples of row masks (BitBoard.masks): cheap to
+# copy, hash and send to pool workers.
+
+def board_masks(grid):
+    if isinstance(grid, BitBoard):
+        return tuple(grid.masks)
+    return tuple(BitBoard._row_mask(row) for row in grid)
+
+
+def place_masks(masks, letter, rot, px, py):
+    """Lock a piece into a copy of masks and clear full rows.
+
+    Returns (masks, lines), or None when part of the piece locks above the board.
+    """
+    new = list(masks)
+    for dy, mask, _ in ROW_MASKS[letter][rot % 4][px + 3]:
+        y = py + dy
+        if y < 0:
+            return None
+        new[y] |= mask
+    kept = [m for m in new if m != FULL_ROW]
+    lines = ROWS - len(kept)
+    return tuple([0] * lines + kept), lines
+
+
+def masks_key(masks):
+    """Zobrist key of a mask board; equal to Grid.zobrist for the same cells."""
+    key = 0
+    for y, m in enumerate(masks):
+        cells = ZOBRIST_CELLS[y]
+        while m:
+            low = m & -m
+            key ^= cells[low.bit_length() - 1]
+            m ^= low
+    return key
+
+
+def evaluate_masks(masks, lines=0, table=None):
+    key = None
+    if table is not None:
+        key = masks_key(masks)
+        hit = table.get(key)
+        if hit is not None:
+            return hit[0] + WEIGHTS['lines'] * lines
+    heights = [0] * COLS
+    seen = filled = 0
+    for y, m in enumerate(masks):
+        new = m & ~seen
+        while new:
+            low = new & -new
+            heights[low.bit_length() - 1] = ROWS - y
+            new ^= low
+        seen |= m
+        filled += bin(m).count('1')
+    height = sum(heights)
+    value = (WEIGHTS['height'] * height + WEIGHTS['holes'] * (height - filled)
+             + WEIGHTS['bumpiness'] * sum(abs(heights[x + 1] - heights[x]) for x in range(COLS - 1)))
+    if table is not None:
+        table.store(key, 0, value)
+    return value + WEIGHTS['lines'] * lines
+
+
+_worker_table = None  # per-process evaluation cache
+
+
+def expand(task):
+    """Children of one node: task is (masks, letter, start, placements or None).
+
+    start is the piece's (rot, x, y); placements limits expansion to the given
+    (rot, x, y) list. Returns (masks, lines, value, rot, x, y) per child.
+    """
+    global _worker_table
+    if _worker_table is None:
+        _worker_table = TranspositionTable()
+    masks, letter, (rot, px, py), placements = task
+    if placements is None:
+        placements = [(p['rot'], p['x'], p['y'])
+                      for p in enumerate_placements(list(masks), letter, rot, px, py, paths=False)]
+    children = []
+    for rot, x, y in placements:
+        placed = place_masks(masks, letter, rot, x, y)
+        if placed is not None:
+            child, lines = placed
+            children.append((child, lines, evaluate_masks(child, lines, _worker_table), rot, x, y))
+    return children
+
+
+def expand_batch(tasks):
+    """expand() over a list of tasks in one call; one pool task per worker per ply."""
+    return [expand(task) for task in tasks]
+
+
+def _split(items, parts):
+    # Contiguous, near-equal slices, so concatenating the results keeps item order
+    size, extra = divmod(len(items), parts)
+    slices = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (i < extra)
+        if end > start:
+            slices.append(items[start:end])
+        start = end
+    return slices
+
+
+def beam_search(masks, pieces, start, width=BEAM_WIDTH, depth=BEAM_DEPTH, deadline=None,
+                mapper=map, chunks=1):
+    """Best first placement (rot, x, y) for pieces[0], searching min(depth, len(pieces)) plies.
+
+    start is pieces[0]'s (rot, x, y); later pieces spawn. mapper runs the
+    expansion (map, or a pool's map): with chunks > 1 each ply's nodes (the
+    root's placements on the first ply) are split into that many contiguous
+    batches, one expand_batch() task each, and the children are merged back
+    in order into one global beam, so the pick is the same for any chunks.
+    Stops after the ply in progress once perf_counter() passes deadline.
+    Returns (placement, nodes).
+    """
+    # Beam entries: (score, line reward so far, masks, root placement)
+    beam = [(0.0, 0.0, masks, None)]
+    nodes = 0
+    for ply, letter in enumerate(pieces[:depth]):
+        if ply == 0:
+            roots = [(p['rot'], p['x'], p['y'])
+                     for p in enumerate_placements(list(masks), letter, *start, paths=False)]
+            tasks = [(masks, letter, start, part) for part in _split(roots, max(chunks, 1))]
+            parents = [beam[0]] * len(tasks)
+        else:
+            tasks = [(node[2], letter, (0, SPAWN_X, SPAWN_Y), None) for node in beam]
+            parents = beam
+        if chunks > 1:
+            results = [children for batch in mapper(expand_batch, _split(tasks, chunks))
+                       for children in batch]
+        else:
+            results = mapper(expand, tasks)
+        children = []
+        for (_, reward, _, root), expanded in zip(parents, results):
+            for child, lines, value, rot, x, y in expanded:
+                gained = reward + WEIGHTS['lines'] * lines
+                children.append((value - WEIGHTS['lines'] * lines + gained, gained, child,
+                                 root or (rot, x, y)))
+        nodes += len(children)
+        if not children:
+            break
+        children.sort(key=lambda node: node[0], reverse=True)
+        beam = children[:width]
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+    return beam[0][3], nodes
+
+
+class BeamSearchPlayer:
+    """Plays tetris_gpt.Tetris with beam search over the current and next piece.
+
+    workers > 1 (default: all cores) expands each ply in a process pool, one
+    batch of nodes per worker; the moves picked do not depend on the worker
+    count. time_budget (seconds) caps the search per move at whole plies.
+    """
+
+    def __init__(self, width=BEAM_WIDTH, depth=BEAM_DEPTH, time_budget=None, workers=None):
+        self.width = width
+        self.depth = depth
+        self.time_budget = time_budget
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = Pool(self.workers) if self.workers > 1 else None
+        self.nodes = 0
+        self.moves = 0
+        self.search_time = 0.0
+
+    def best_placement(self, game):
+        """Placement dict from game.placements() the search picks, or None."""
+        if game.game_over:
+            return None
+        c = game.current
+        start = time.perf_counter()
+        deadline = start + self.time_budget if self.time_budget is not None else None
+        mapper = self._pool.map if self._pool else map
+        root, nodes = beam_search(board_masks(game.grid), [c['letter'], game.next_piece],
+                                  (c['rot'], c['x'], c['y']), self.width, self.depth, deadline,
+                                  mapper, self.workers)
+        self.search_time += time.perf_counter() - start
+        self.nodes += nodes
+        self.moves += 1
+        if root is None:
+            return None
+        return next(p for p in game.placements() if (p['rot'], p['x'], p['y']) == root)
+
+    def play(self, game, max_pieces=None):
+        """Place pieces until game over (or max_pieces); returns pieces placed."""
+        placed = 0
+        while not game.game_over and (max_pieces is None or placed < max_pieces):
+            placement = self.best_placement(game)
+            if placement is None:
+                break
+            for action in placement['path']:
+                game.step(action)
+            placed += 1
+        return placed
+
+    def stats(self):
+        return {'moves': self.moves, 'nodes': self.nodes, 'search_time': self.search_time,
+                'nodes_per_sec': self.nodes / self.search_time if self.search_time else 0.0}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Beam-search player for tetris_gpt (load generator)")
+    parser.add_argument('--games', type=int, default=1)
+    parser.add_argument('--pieces', type=int, default=200, help="per-game piece cap")
+    parser.add_argument('--width', type=int, default=BEAM_WIDTH)
+    parser.add_argument('--depth', type=int, default=BEAM_DEPTH)
+    parser.add_argument('--budget', type=float, default=None, help="seconds per move")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="processes expanding each ply")
+    parser.add_argument('--seed', type=int, default=0, help="first game seed")
+    args = parser.parse_args()
+
+    with BeamSearchPlayer(args.width, args.depth, args.budget, args.workers) as player:
+        for seed in range(args.seed, args.seed + args.games):
+            game = Tetris(bitboard=True, seed=seed)
+            pieces = player.play(game, args.pieces)
+            print(f"seed {seed}: pieces={pieces} lines={game.lines} score={game.score} "
+                  f"game_over={game.game_over}")
+        stats = player.stats()
+    print(f"workers={args.workers} width={args.width} depth={args.depth} "
+          f"nodes={stats['nodes']} nodes/sec={stats['nodes_per_sec']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
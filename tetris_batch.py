@@ -0,0 +1,264 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from tetris_gpt import PIECES, KICK_TESTS, COLS, ROWS, SPAWN_X, SPAWN_Y, SCORES_PER_LINES, Tetris
+
+# ----------------------------
+# Batched tetris_gpt engine
+# ----------------------------
+# Holds N boards as one (N, ROWS, COLS) uint8 array and applies move, rotate,
+# drop, lock and clear to all of them with vectorized operations. Rules,
+# rotation tables, kicks and scoring are the ones from tetris_gpt, so a board
+# stepped here ends in the same state as a scalar Tetris fed the same inputs.
+#
+# Each board's piece sequence is drawn ahead, whole 7-bags at a time, into a
+# (N, QUEUE) array with a per-board cursor, so spawning is an array lookup
+# rather than a generator call per board.
+
+LETTERS = list(PIECES.keys())
+# Board cells hold 0 for empty or 1 + index into LETTERS
+BLOCKS = np.array([PIECES[letter] for letter in LETTERS], dtype=np.int16)  # (7, 4, 4, 2)
+LINE_SCORES = np.array([0] + [SCORES_PER_LINES[n] for n in range(1, 5)], dtype=np.int64)
+
+# Action codes accepted by BatchTetris.step, same vocabulary as Tetris.step
+ACTIONS = ('left', 'right', 'rotate', 'rotate_ccw', 'down', 'drop')
+LEFT, RIGHT, ROTATE, ROTATE_CCW, DOWN, DROP = range(len(ACTIONS))
+
+QUEUE_BAGS = 16                        # bags drawn per refill
+QUEUE = QUEUE_BAGS * len(LETTERS)      # pieces queued per board
+
+
+def _draw_bags(rng, bags=QUEUE_BAGS):
+    # The draws tetris_gpt's bag_generator makes, as indices into LETTERS:
+    # shuffle a fresh bag, then deal it from the end
+    pieces = []
+    for _ in range(bags):
+        bag = list(range(len(LETTERS)))
+        rng.shuffle(bag)
+        pieces.extend(reversed(bag))
+    return pieces
+
+
+class BatchTetris:
+    def __init__(self, n, seeds=None):
+        if seeds is None:
+            seeds = [random.randrange(2 ** 32) for _ in range(n)]
+        if len(seeds) != n:
+            raise ValueError("Expected one seed per board")
+        self.n = n
+        self.boards = np.zeros((n, ROWS, COLS), dtype=np.uint8)
+        self.rot = np.zeros(n, dtype=np.int16)
+        self.x = np.full(n, SPAWN_X, dtype=np.int16)
+        self.y = np.full(n, SPAWN_Y, dtype=np.int16)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lines = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+
+        # Tetris.__init__ spawns from the bag, then preloads "next" twice,
+        # so the second piece of every bag stream is never played.
+        self.rngs = [random.Random(seed) for seed in seeds]
+        self.queue = np.array([_draw_bags(rng) for rng in self.rngs], dtype=np.int16).reshape(n, QUEUE)
+        self.piece = self.queue[:, 0].copy()
+        self.next_piece = self.queue[:, 2].copy()
+        self.cursor = np.full(n, 3, dtype=np.int64)
+
+    # ---- queries ----
+    def _valid(self, idx, rot, x, y):
+        # Vectorized valid_position for boards idx with per-board rot/x/y
+        blocks = BLOCKS[self.piece[idx], rot % 4]
+        bx = x[:, None] + blocks[..., 0]
+        by = y[:, None] + blocks[..., 1]
+        inside = (bx >= 0) & (bx < COLS) & (by < ROWS)
+        visible = inside & (by >= 0)
+        cells = self.boards[idx[:, None], np.clip(by, 0, ROWS - 1), np.clip(bx, 0, COLS - 1)]
+        return inside.all(axis=1) & ~((cells != 0) & visible).any(axis=1)
+
+    def grid(self, i):
+        """Board i in tetris_gpt's list-of-letters representation."""
+        return [[LETTERS[c - 1] if c else None for c in row] for row in self.boards[i].tolist()]
+
+    def current(self, i):
+        return {'letter': LETTERS[self.piece[i]], 'rot': int(self.rot[i]),
+                'x': int(self.x[i]), 'y': int(self.y[i])}
+
+    # ---- actions (mask selects the boards to act on) ----
+    def _live(self, mask):
+        return np.flatnonzero(mask & ~self.game_over)
+
+    def move(self, mask, dx):
+        self._move(self._live(mask), dx)
+
+    def rotate(self, mask, cw=True):
+        self._rotate(self._live(mask), cw)
+
+    def drop_one(self, mask):
+        self._drop_one(self._live(mask))
+
+    def hard_drop(self, mask):
+        self._hard_drop(self._live(mask))
+
+    # idx: live boards to act on
+    def _move(self, idx, dx):
+        nx = self.x[idx] + dx
+        ok = self._valid(idx, self.rot[idx], nx, self.y[idx])
+        self.x[idx[ok]] = nx[ok]
+
+    def _rotate(self, idx, cw=True):
+        new_rot = (self.rot[idx] + (1 if cw else -1)) % 4
+        for dx, dy in KICK_TESTS:
+            if not len(idx):
+                break
+            ok = self._valid(idx, new_rot, self.x[idx] + dx, self.y[idx] + dy)
+            hit = idx[ok]
+            self.rot[hit] = new_rot[ok]
+            self.x[hit] += dx
+            self.y[hit] += dy
+            idx, new_rot = idx[~ok], new_rot[~ok]
+
+    def _drop_one(self, idx):
+        ok = self._valid(idx, self.rot[idx], self.x[idx], self.y[idx] + 1)
+        self.y[idx[ok]] += 1
+        self._lock(idx[~ok])
+
+    def _hard_drop(self, idx):
+        # Fall distance in one pass: for each block, the first filled cell
+        # below it in its column (or the floor), nearest block wins
+        blocks = BLOCKS[self.piece[idx], self.rot[idx] % 4]
+        bx = self.x[idx, None] + blocks[..., 0]
+        by = self.y[idx, None] + blocks[..., 1]
+        columns = self.boards[idx[:, None], :, bx]                      # (m, 4, ROWS)
+        below = np.arange(ROWS) > by[..., None]
+        hits = (columns != 0) & below
+        first = np.where(hits.any(axis=2), hits.argmax(axis=2), ROWS)
+        fall = (first - by - 1).min(axis=1)
+        self.y[idx] += fall.astype(self.y.dtype)
+        self.score[idx] += 2 * fall
+        self._lock(idx)
+
+    def step(self, actions):
+        """Apply one action code per board (see ACTIONS)."""
+        # Every board takes exactly one action, so the live boards are grouped
+        # by action code in one sort and each group is handled once
+        live = np.flatnonzero(~self.game_over)
+        codes = np.asarray(actions)[live]
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(ACTIONS) + 1))
+        for code in range(len(ACTIONS)):
+            idx = live[order[bounds[code]:bounds[code + 1]]]
+            if not len(idx):
+                continue
+            if code == LEFT:
+                self._move(idx, -1)
+            elif code == RIGHT:
+                self._move(idx, 1)
+            elif code == ROTATE:
+                self._rotate(idx, cw=True)
+            elif code == ROTATE_CCW:
+                self._rotate(idx, cw=False)
+            elif code == DOWN:
+                self._drop_one(idx)
+            else:
+                self._hard_drop(idx)
+        return ~self.game_over
+
+    # ---- lock / clear / spawn ----
+    def _lock(self, idx):
+        if not len(idx):
+            return
+        blocks = BLOCKS[self.piece[idx], self.rot[idx] % 4]
+        bx = self.x[idx, None] + blocks[..., 0]
+        by = self.y[idx, None] + blocks[..., 1]
+        b = np.broadcast_to(idx[:, None], by.shape)
+        visible = by >= 0
+        self.boards[b[visible], by[visible], bx[visible]] = \
+            np.broadcast_to(self.piece[idx, None] + 1, by.shape)[visible]
+        self._clear(idx)
+        self._spawn(idx)
+
+    def _clear(self, idx):
+        sub = self.boards[idx]
+        full = (sub != 0).all(axis=2)
+        counts = full.sum(axis=1)
+        if not counts.any():
+            return
+        # Stable sort puts full rows on top, the rest keep their order; then blank them
+        order = np.argsort(~full, axis=1, kind='stable')
+        sub = np.take_along_axis(sub, order[:, :, None], axis=1)
+        sub[np.arange(ROWS)[None, :] < counts[:, None]] = 0
+        self.boards[idx] = sub
+
+        self.lines[idx] += counts
+        self.score[idx] += LINE_SCORES[counts] * self.level[idx]
+        self.level[idx] = np.maximum(self.level[idx], 1 + self.lines[idx] // 10)
+
+    def _spawn(self, idx):
+        self.piece[idx] = self.next_piece[idx]
+        empty = idx[self.cursor[idx] == QUEUE]
+        for i in empty.tolist():
+            self.queue[i] = _draw_bags(self.rngs[i])
+        self.cursor[empty] = 0
+        self.next_piece[idx] = self.queue[idx, self.cursor[idx]]
+        self.cursor[idx] += 1
+        self.rot[idx] = 0
+        self.x[idx] = SPAWN_X
+        self.y[idx] = SPAWN_Y
+        ok = self._valid(idx, self.rot[idx], self.x[idx], self.y[idx])
+        self.game_over[idx[~ok]] = True
+
+
+# ----------------------------
+# Throughput benchmark
+# ----------------------------
+
+def measure_throughput(n=10000, steps=100, seed=0, scalar_games=200):
+    """Board-steps/sec of BatchTetris and of scalar Tetris.step on the same random actions.
+
+    The batch steps n boards for steps rounds; the scalar baseline plays the
+    first scalar_games of those boards one Tetris at a time.
+    """
+    rng = np.random.default_rng(seed)
+    script = rng.integers(0, len(ACTIONS), size=(steps, n))
+    seeds = list(range(seed, seed + n))
+
+    batch = BatchTetris(n, seeds)
+    start = time.perf_counter()
+    for actions in script:
+        batch.step(actions)
+    batch_seconds = time.perf_counter() - start
+
+    scalar_games = min(scalar_games, n)
+    scalar_seconds = 0.0
+    for i in range(scalar_games):
+        game = Tetris(seed=seeds[i])
+        names = [ACTIONS[code] for code in script[:, i].tolist()]
+        start = time.perf_counter()
+        for action in names:
+            game.step(action)
+        scalar_seconds += time.perf_counter() - start
+
+    batch_rate = n * steps / batch_seconds if batch_seconds else 0.0
+    scalar_rate = scalar_games * steps / scalar_seconds if scalar_seconds else 0.0
+    return {'boards': n, 'steps': steps, 'batch_steps_per_sec': batch_rate,
+            'scalar_steps_per_sec': scalar_rate,
+            'speedup': batch_rate / scalar_rate if scalar_rate else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Board-steps/sec of the batched engine against scalar Tetris")
+    parser.add_argument('--boards', type=int, default=10000)
+    parser.add_argument('--steps', type=int, default=100)
+    parser.add_argument('--scalar-games', type=int, default=200, help="games for the scalar baseline")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    stats = measure_throughput(args.boards, args.steps, args.seed, args.scalar_games)
+    print(f"batch  : {stats['batch_steps_per_sec']:,.0f} board-steps/s ({stats['boards']} boards)")
+    print(f"scalar : {stats['scalar_steps_per_sec']:,.0f} board-steps/s")
+    print(f"speedup: {stats['speedup']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,12 @@ import pygame
 import random
 import sys
 
-# Initialize Pygame
-pygame.init()
+from board import Board
+from latency import latency_from_env
+from profiler import profiler_from_env
+from replay import record_from_env
+from textcache import get_font, render_text
+from timestep import scheduler_from_env
 
 # Constants
 SCREEN_WIDTH = 400
@@ -52,12 +56,17 @@ SHAPE_COLORS = {
     'L': ORANGE
 }
 
+# Board cells hold palette indices: 0 is empty, 1.. one per shape colour
+PALETTE = [BLACK] + list(SHAPE_COLORS.values())
+PIECE_INDEX = {name: i for i, name in enumerate(SHAPE_COLORS, 1)}
+
 
 class Tetromino:
     def __init__(self, shape_name):
         self.shape_name = shape_name
         self.shape = [row[:] for row in SHAPES[shape_name]]
         self.color = SHAPE_COLORS[shape_name]
+        self.index = PIECE_INDEX[shape_name]
         self.x = GRID_WIDTH // 2 - len(self.shape[0]) // 2
         self.y = 0
 
@@ -70,71 +79,96 @@ class Tetromino:
 
 
 class Tetris:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH + SIDEBAR_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Tetris")
-        self.clock = pygame.time.Clock()
-        self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-        self.grid_colors = [[BLACK for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+    def __init__(self, headless=False, seed=None):
+        self.headless = headless
+        # Each game owns its RNG; the seed is kept so the game can be replayed
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.recording = None
+        self.clock_ms = 0
+        if headless:
+            # No window, clock or fonts: the game is driven through step()
+            self.screen = None
+            self.clock = None
+        else:
+            pygame.init()
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH + SIDEBAR_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Tetris")
+            self.clock = pygame.time.Clock()
+        self.grid = Board(GRID_WIDTH, GRID_HEIGHT, PALETTE)
         self.current_piece = self.new_piece()
         self.game_over = False
         self.score = 0
+        self.lines = 0
+        self.pieces = 0
         self.fall_time = 0
         self.fall_speed = 500  # milliseconds
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
+        self.cell_sprites = {}
+        if headless:
+            self.font = None
+            self.small_font = None
+        else:
+            self.font = get_font(None, 36)
+            self.small_font = get_font(None, 24)
+            for color in [BLACK] + list(SHAPE_COLORS.values()):
+                self.cell_sprite(color)
 
     def new_piece(self):
         """Create a new random tetromino"""
-        shape_name = random.choice(list(SHAPES.keys()))
+        shape_name = self.rng.choice(list(SHAPES.keys()))
         return Tetromino(shape_name)
 
     def valid_move(self, piece, x, y, shape=None):
         """Check if a move is valid"""
         if shape is None:
             shape = piece.shape
+        cells = self.grid.cells
         
         for i, row in enumerate(shape):
+            new_y = y + i
+            # Offset of the board row under this shape row (rows above the board are empty)
+            base = self.grid.offsets[new_y] if 0 <= new_y < GRID_HEIGHT else -1
             for j, cell in enumerate(row):
                 if cell:
                     new_x = x + j
-                    new_y = y + i
                     
                     # Check boundaries
                     if new_x < 0 or new_x >= GRID_WIDTH or new_y >= GRID_HEIGHT:
                         return False
                     
                     # Check collision with settled blocks
-                    if new_y >= 0 and self.grid[new_y][new_x]:
+                    if base >= 0 and cells[base + new_x]:
                         return False
         
         return True
 
     def merge_piece(self):
-        """Merge current piece into the grid"""
+        """Merge current piece into the grid, returning the rows it touched"""
+        rows = set()
         for i, row in enumerate(self.current_piece.shape):
             for j, cell in enumerate(row):
                 if cell:
                     grid_y = self.current_piece.y + i
                     grid_x = self.current_piece.x + j
                     if grid_y >= 0:
-                        self.grid[grid_y][grid_x] = 1
-                        self.grid_colors[grid_y][grid_x] = self.current_piece.color
+                        # The board keeps row fills and column heights in step
+                        self.grid.set_cell(grid_x, grid_y, self.current_piece.index)
+                        rows.add(grid_y)
+        return rows
 
-    def clear_lines(self):
-        """Clear completed lines and update score"""
-        lines_cleared = 0
-        y = GRID_HEIGHT - 1
-        
-        while y >= 0:
-            if all(self.grid[y]):
-                lines_cleared += 1
-                del self.grid[y]
-                del self.grid_colors[y]
-                self.grid.insert(0, [0 for _ in range(GRID_WIDTH)])
-                self.grid_colors.insert(0, [BLACK for _ in range(GRID_WIDTH)])
-            else:
-                y -= 1
+    def clear_lines(self, rows=None):
+        """Clear completed lines and update score
+
+        Only the given rows are checked for completion; with no rows every
+        row is checked.
+        """
+        if rows is None:
+            rows = range(GRID_HEIGHT)
+        full = {y for y in rows if self.row_fill[y] == GRID_WIDTH}
+        lines_cleared = len(full)
+        # Full rows go back to the top of the board's row table, emptied
+        self.grid.clear_rows(full)
+        self.lines += lines_cleared
         
         # Scoring system
         if lines_cleared == 1:
@@ -152,8 +186,9 @@ class Tetris:
             self.current_piece.y += 1
             return True
         else:
-            self.merge_piece()
-            self.clear_lines()
+            rows = self.merge_piece()
+            self.pieces += 1
+            self.clear_lines(rows)
             self.current_piece = self.new_piece()
             
             # Check game over
@@ -179,34 +214,127 @@ class Tetris:
         if self.valid_move(self.current_piece, self.current_piece.x, self.current_piece.y, rotated_shape):
             self.current_piece.shape = rotated_shape
 
+    def column_height(self, x, height=GRID_HEIGHT):
+        """Height of column x's topmost block, searching down from the given height"""
+        return self.grid.column_height(x, height)
+
+    @property
+    def heights(self):
+        """Column heights, kept current by the board on every write"""
+        return self.grid.heights
+
+    @property
+    def row_fill(self):
+        """Blocks per row, kept current by the board on every write"""
+        return self.grid.fill
+
+    def rebuild_heights(self):
+        """Recompute column heights and row fills from the cells"""
+        self.grid.recount()
+
+    @property
+    def grid_colors(self):
+        """Lazy cell colours (BLACK where empty): grid_colors[y] resolves one row"""
+        return self.grid.colors()
+
+    def surface(self):
+        """Height differences between neighbouring columns"""
+        return [self.heights[x + 1] - self.heights[x] for x in range(GRID_WIDTH - 1)]
+
+    def landing_row(self, piece, x, shape=None):
+        """Row a piece dropped from above the stack rests at, from its bottom profile"""
+        if shape is None:
+            shape = piece.shape
+        land = GRID_HEIGHT
+        for j in range(len(shape[0])):
+            bottom = max((i for i, row in enumerate(shape) if row[j]), default=None)
+            if bottom is not None:
+                land = min(land, GRID_HEIGHT - self.heights[x + j] - 1 - bottom)
+        return land
+
     def hard_drop(self):
         """Drop piece to the bottom instantly"""
+        piece = self.current_piece
+        land = self.landing_row(piece, piece.x)
+        # The row comes from the height index; only trust it if the piece
+        # really rests there (fits, and is blocked one row lower)
+        if (piece.y <= land and self.valid_move(piece, piece.x, land)
+                and not self.valid_move(piece, piece.x, land + 1)):
+            # Above the stack: nothing in between, jump straight to the landing row
+            self.score += 2 * (land - self.current_piece.y)
+            self.current_piece.y = land
+            self.move_down()
+            return
+        # Tucked under an overhang: walk down row by row
         while self.move_down():
             self.score += 2
 
+    def step(self, action):
+        """Apply one input programmatically, returns False once the game is over"""
+        if self.recording is not None:
+            self.recording.add_input(action)
+        if action == 'restart':
+            if self.game_over:
+                self.reset()
+            return not self.game_over
+        if self.game_over:
+            return False
+        if action == 'left':
+            self.move_left()
+        elif action == 'right':
+            self.move_right()
+        elif action == 'rotate':
+            self.rotate_piece()
+        elif action == 'down':
+            self.move_down()
+        elif action == 'drop':
+            self.hard_drop()
+        else:
+            raise ValueError(f"Unknown action: {action}")
+        return not self.game_over
+
+    def tick(self, dt_ms):
+        """Advance the game clock by dt_ms milliseconds and apply auto fall"""
+        if self.recording is not None:
+            self.recording.add_frame(dt_ms)
+        self.clock_ms += dt_ms
+        if not self.game_over:
+            if self.clock_ms - self.fall_time > self.fall_speed:
+                self.move_down()
+                self.fall_time = self.clock_ms
+
+    def cell_sprite(self, color):
+        """Pre-rendered cell (fill plus grid line) for a colour, built once"""
+        sprite = self.cell_sprites.get(color)
+        if sprite is None:
+            sprite = pygame.Surface((GRID_SIZE, GRID_SIZE))
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+            sprite.fill(color)
+            pygame.draw.rect(sprite, GRAY, sprite.get_rect(), 1)
+            self.cell_sprites[color] = sprite
+        return sprite
+
     def draw_grid(self):
         """Draw the game grid"""
         # Draw settled blocks
-        for y in range(GRID_HEIGHT):
+        cells = []
+        sprites = [self.cell_sprite(color) for color in PALETTE]
+        board = self.grid.cells
+        for y, o in enumerate(self.grid.offsets):
             for x in range(GRID_WIDTH):
-                rect = pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-                if self.grid[y][x]:
-                    pygame.draw.rect(self.screen, self.grid_colors[y][x], rect)
-                    pygame.draw.rect(self.screen, GRAY, rect, 1)
-                else:
-                    pygame.draw.rect(self.screen, BLACK, rect)
-                    pygame.draw.rect(self.screen, GRAY, rect, 1)
+                cells.append((sprites[board[o + x]], (x * GRID_SIZE, y * GRID_SIZE)))
 
         # Draw current piece
+        sprite = self.cell_sprite(self.current_piece.color)
         for i, row in enumerate(self.current_piece.shape):
             for j, cell in enumerate(row):
                 if cell:
                     x = (self.current_piece.x + j) * GRID_SIZE
                     y = (self.current_piece.y + i) * GRID_SIZE
                     if y >= 0:
-                        rect = pygame.Rect(x, y, GRID_SIZE, GRID_SIZE)
-                        pygame.draw.rect(self.screen, self.current_piece.color, rect)
-                        pygame.draw.rect(self.screen, GRAY, rect, 1)
+                        cells.append((sprite, (x, y)))
+        self.screen.blits(cells, doreturn=False)
 
     def draw_sidebar(self):
         """Draw the sidebar with score and instructions"""
@@ -216,10 +344,10 @@ class Tetris:
         pygame.draw.rect(self.screen, BLACK, (sidebar_x, 0, SIDEBAR_WIDTH, SCREEN_HEIGHT))
         
         # Draw score
-        score_text = self.font.render("SCORE", True, WHITE)
+        score_text = render_text(self.font, "SCORE", WHITE)
         self.screen.blit(score_text, (sidebar_x + 20, 50))
         
-        score_value = self.font.render(str(self.score), True, WHITE)
+        score_value = render_text(self.font, str(self.score), WHITE)
         self.screen.blit(score_value, (sidebar_x + 20, 90))
         
         # Draw instructions
@@ -233,7 +361,7 @@ class Tetris:
         
         y_offset = 200
         for i, instruction in enumerate(instructions):
-            text = self.small_font.render(instruction, True, WHITE)
+            text = render_text(self.small_font, instruction, WHITE)
             self.screen.blit(text, (sidebar_x + 10, y_offset + i * 30))
 
     def draw(self):
@@ -243,61 +371,78 @@ class Tetris:
         self.draw_sidebar()
         
         if self.game_over:
-            game_over_text = self.font.render("GAME OVER", True, RED)
+            game_over_text = render_text(self.font, "GAME OVER", RED)
             text_rect = game_over_text.get_rect(center=(GRID_WIDTH * GRID_SIZE // 2, SCREEN_HEIGHT // 2))
             self.screen.blit(game_over_text, text_rect)
             
-            restart_text = self.small_font.render("Press R to Restart", True, WHITE)
+            restart_text = render_text(self.small_font, "Press R to Restart", WHITE)
             restart_rect = restart_text.get_rect(center=(GRID_WIDTH * GRID_SIZE // 2, SCREEN_HEIGHT // 2 + 40))
             self.screen.blit(restart_text, restart_rect)
-        
-        pygame.display.flip()
 
     def reset(self):
         """Reset the game"""
-        self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-        self.grid_colors = [[BLACK for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+        self.grid = Board(GRID_WIDTH, GRID_HEIGHT, PALETTE)
         self.current_piece = self.new_piece()
         self.game_over = False
         self.score = 0
+        self.lines = 0
+        self.pieces = 0
         self.fall_time = 0
 
     def run(self):
         """Main game loop"""
+        scheduler = scheduler_from_env()
+        probe = latency_from_env('claude')
+        profiler = profiler_from_env('claude')
+        graph_rect = pygame.Rect(GRID_WIDTH * GRID_SIZE + 10, SCREEN_HEIGHT - 100, 180, 80)
+        dt = 0
         while True:
-            current_time = pygame.time.get_ticks()
-            
+            if profiler:
+                profiler.start()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
                 
-                if event.type == pygame.KEYDOWN:
-                    if self.game_over:
-                        if event.key == pygame.K_r:
-                            self.reset()
-                    else:
-                        if event.key == pygame.K_LEFT:
-                            self.move_left()
-                        elif event.key == pygame.K_RIGHT:
-                            self.move_right()
-                        elif event.key == pygame.K_DOWN:
-                            self.move_down()
-                        elif event.key == pygame.K_UP:
-                            self.rotate_piece()
-                        elif event.key == pygame.K_SPACE:
-                            self.hard_drop()
+                if event.type == pygame.KEYDOWN and event.key in KEY_ACTIONS:
+                    if probe:
+                        probe.key_down()
+                    self.step(KEY_ACTIONS[event.key])
+                    if probe:
+                        probe.applied()
+            
+            if profiler:
+                profiler.mark('event')
             
-            # Auto fall
-            if not self.game_over:
-                if current_time - self.fall_time > self.fall_speed:
-                    self.move_down()
-                    self.fall_time = current_time
+            # Auto fall, in fixed steps
+            scheduler.run(dt, self.tick)
+            if profiler:
+                profiler.mark('update')
             
             self.draw()
-            self.clock.tick(60)
+            if profiler and profiler.overlay:
+                profiler.draw_overlay(self.screen, graph_rect)
+            if profiler:
+                profiler.mark('render')
+            pygame.display.flip()
+            if probe:
+                probe.flipped()
+            if profiler:
+                profiler.mark('flip')
+                profiler.end_frame()
+            dt = self.clock.tick(60)
+
+
+KEY_ACTIONS = {
+    pygame.K_LEFT: 'left',
+    pygame.K_RIGHT: 'right',
+    pygame.K_DOWN: 'down',
+    pygame.K_UP: 'rotate',
+    pygame.K_SPACE: 'drop',
+    pygame.K_r: 'restart',
+}
 
 
 if __name__ == "__main__":
-    game = Tetris()
+    game = record_from_env(Tetris(), 'claude')
     game.run()
\ No newline at end of file
@@ -1,8 +1,12 @@
 import pygame
 import random
 
-# Initialize Pygame
-pygame.init()
+from board import Board
+from latency import latency_from_env
+from profiler import profiler_from_env
+from replay import record_from_env
+from textcache import get_font, render_text
+from timestep import scheduler_from_env
 
 # Screen dimensions
 SCREEN_WIDTH = 400
@@ -39,53 +43,90 @@ SHAPES = [
 # Tetromino colors
 SHAPE_COLORS = [CYAN, PURPLE, ORANGE, BLUE, YELLOW, GREEN, RED]
 
+# Board cells and pieces carry ids into this palette: 0 is empty, SHAPES[i] is i + 1
+PALETTE = [BLACK] + SHAPE_COLORS
+
+FPS = 60
+FALL_MS = 200  # gravity: one row per 200 ms, the original 5 FPS cadence
+
 class Tetromino:
-    def __init__(self, x, y, shape):
+    def __init__(self, x, y, shape, piece_id=None):
         self.x = x
         self.y = y
         self.shape = shape
-        self.color = SHAPE_COLORS[SHAPES.index(shape)]
+        # Spawned pieces pass their id; a bare shape is looked up once
+        self.id = SHAPES.index(shape) + 1 if piece_id is None else piece_id
         self.rotation = 0
 
+    @property
+    def color(self):
+        return PALETTE[self.id]
+
     def rotate(self):
         self.shape = [list(row) for row in zip(*self.shape[::-1])]
 
 class Tetris:
-    def __init__(self, width, height):
+    def __init__(self, width, height, seed=None):
+        # Each game owns its RNG; the seed is kept so the game can be replayed
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.recording = None
         self.width = width
         self.height = height
-        self.grid = [[0 for _ in range(width)] for _ in range(height)]
+        self.grid = Board(width, height, PALETTE)
         self.current_piece = None
         self.score = 0
+        self.lines = 0
+        self.pieces = 0
+        self.fall_time = 0
         self.game_over = False
 
     def new_piece(self):
-        self.current_piece = Tetromino(self.width // 2 - 1, 0, random.choice(SHAPES))
+        # Same draw as rng.choice(SHAPES), keeping the index as the piece id
+        i = self.rng.randrange(len(SHAPES))
+        self.current_piece = Tetromino(self.width // 2 - 1, 0, SHAPES[i], i + 1)
 
     def check_collision(self, piece):
+        cells, offsets = self.grid.cells, self.grid.offsets
+        px, py = piece.x, piece.y
         for y, row in enumerate(piece.shape):
+            # Row start in the board; negative rows wrap like list indexing did
+            base = offsets[py + y] if py + y < self.height else None
             for x, cell in enumerate(row):
                 if cell:
-                    if (piece.y + y >= self.height or
-                            piece.x + x < 0 or
-                            piece.x + x >= self.width or
-                            self.grid[piece.y + y][piece.x + x]):
+                    if (base is None or
+                            px + x < 0 or
+                            px + x >= self.width or
+                            cells[base + px + x]):
                         return True
         return False
 
     def lock_piece(self, piece):
+        rows = set()
         for y, row in enumerate(piece.shape):
             for x, cell in enumerate(row):
                 if cell:
-                    self.grid[piece.y + y][piece.x + x] = piece.color
-        self.clear_lines()
-
-    def clear_lines(self):
-        lines_to_clear = [i for i, row in enumerate(self.grid) if all(row)]
-        for i in lines_to_clear:
-            del self.grid[i]
-            self.grid.insert(0, [0 for _ in range(self.width)])
-        self.score += len(lines_to_clear) * 100
+                    # Same row the grid write lands on, negative rows included
+                    grid_y = (piece.y + y) % self.height
+                    self.grid.set_cell(piece.x + x, grid_y, piece.id)
+                    rows.add(grid_y)
+        self.pieces += 1
+        self.clear_lines(rows)
+
+    @property
+    def row_fill(self):
+        # Blocks per row, kept current by the board on every write
+        return self.grid.fill
+
+    def clear_lines(self, rows=None):
+        # Only rows touched by the last lock can have filled up; with no rows,
+        # check them all (the grid may have been written directly)
+        if rows is None:
+            rows = range(self.height)
+        full = {i for i in rows if self.row_fill[i] == self.width}
+        self.grid.clear_rows(full)
+        self.lines += len(full)
+        self.score += len(full) * 100
 
     def update(self):
         if not self.current_piece:
@@ -114,55 +155,120 @@ class Tetris:
             self.current_piece.rotate()
             self.current_piece.rotate()
 
+    def step(self, action):
+        # Programmatic input for headless play; returns False once the game is over
+        if self.recording is not None:
+            self.recording.add_input(action)
+        if self.game_over:
+            return False
+        if not self.current_piece:
+            self.new_piece()
+            if self.check_collision(self.current_piece):
+                self.game_over = True
+                return False
+        if action == 'left':
+            self.move(-1)
+        elif action == 'right':
+            self.move(1)
+        elif action == 'rotate':
+            self.rotate()
+        elif action == 'down':
+            self.update()
+        elif action == 'drop':
+            piece = self.current_piece
+            while not self.game_over and self.current_piece is piece:
+                self.update()
+        else:
+            raise ValueError(f"Unknown action: {action}")
+        return not self.game_over
+
+    def tick(self, dt_ms):
+        # Advance game time by dt_ms; gravity moves the piece once per FALL_MS
+        if self.recording is not None:
+            self.recording.add_frame(dt_ms)
+        self.fall_time += dt_ms
+        if not self.game_over and self.fall_time >= FALL_MS:
+            self.fall_time -= FALL_MS
+            self.update()
+
+
+# Pre-rendered block per colour, so drawing a cell is a single blit
+_cell_sprites = {}
+
+def cell_sprite(color):
+    sprite = _cell_sprites.get(color)
+    if sprite is None:
+        sprite = pygame.Surface((GRID_SIZE - 1, GRID_SIZE - 1))
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        sprite.fill(color)
+        _cell_sprites[color] = sprite
+    return sprite
 
 def draw_grid(surface, grid):
-    for y in range(len(grid)):
-        for x in range(len(grid[y])):
-            if grid[y][x]:
-                pygame.draw.rect(surface, grid[y][x], (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE - 1, GRID_SIZE - 1))
-
-def draw_piece(surface, piece):
-    for y, row in enumerate(piece.shape):
+    # Cells hold palette ids; colours are only resolved here
+    sprites = [cell_sprite(color) for color in PALETTE]
+    cells = []
+    for y, row in enumerate(grid):
         for x, cell in enumerate(row):
             if cell:
-                pygame.draw.rect(surface, piece.color, ((piece.x + x) * GRID_SIZE, (piece.y + y) * GRID_SIZE, GRID_SIZE - 1, GRID_SIZE - 1))
+                cells.append((sprites[cell], (x * GRID_SIZE, y * GRID_SIZE)))
+    surface.blits(cells, doreturn=False)
+
+def draw_piece(surface, piece):
+    sprite = cell_sprite(PALETTE[piece.id])
+    surface.blits([(sprite, ((piece.x + x) * GRID_SIZE, (piece.y + y) * GRID_SIZE))
+                   for y, row in enumerate(piece.shape)
+                   for x, cell in enumerate(row) if cell], doreturn=False)
 
 def draw_score(surface, score):
-    font = pygame.font.Font(None, 36)
-    text = font.render(f"Score: {score}", True, WHITE)
+    text = render_text(get_font(None, 36), f"Score: {score}", WHITE)
     surface.blit(text, (10, 10))
 
 def draw_game_over(surface):
-    font = pygame.font.Font(None, 48)
-    text = font.render("Game Over", True, RED)
+    text = render_text(get_font(None, 48), "Game Over", RED)
     surface.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 - text.get_height() // 2))
 
 
 def main():
+    pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Tetris")
+    _cell_sprites.clear()
+    for color in SHAPE_COLORS:
+        cell_sprite(color)
     clock = pygame.time.Clock()
-    game = Tetris(BOARD_WIDTH, BOARD_HEIGHT)
+    game = record_from_env(Tetris(BOARD_WIDTH, BOARD_HEIGHT), 'gemini')
+    scheduler = scheduler_from_env()
+    probe = latency_from_env('gemini')
+    profiler = profiler_from_env('gemini')
+    graph_rect = pygame.Rect(BOARD_WIDTH * GRID_SIZE + 5, 50, 90, 60)
+    key_actions = {pygame.K_LEFT: 'left', pygame.K_RIGHT: 'right', pygame.K_DOWN: 'down', pygame.K_UP: 'rotate'}
 
     running = True
+    dt = 0
     while running:
+        if profiler:
+            profiler.start()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
             if event.type == pygame.KEYDOWN and not game.game_over:
-                if event.key == pygame.K_LEFT:
-                    game.move(-1)
-                if event.key == pygame.K_RIGHT:
-                    game.move(1)
-                if event.key == pygame.K_DOWN:
-                    game.update()
-                if event.key == pygame.K_UP:
-                    game.rotate()
+                if event.key in key_actions:
+                    if probe:
+                        probe.key_down()
+                    game.step(key_actions[event.key])
+                    if probe:
+                        probe.applied()
 
-        screen.fill(BLACK)
+        if profiler:
+            profiler.mark('event')
+
+        scheduler.run(dt, game.tick)
+        if profiler:
+            profiler.mark('update')
 
-        if not game.game_over:
-            game.update()
+        screen.fill(BLACK)
 
         draw_grid(screen, game.grid)
         if game.current_piece:
@@ -171,9 +277,18 @@ def main():
 
         if game.game_over:
             draw_game_over(screen)
+        if profiler and profiler.overlay:
+            profiler.draw_overlay(screen, graph_rect)
+        if profiler:
+            profiler.mark('render')
 
         pygame.display.flip()
-        clock.tick(5)
+        if probe:
+            probe.flipped()
+        if profiler:
+            profiler.mark('flip')
+            profiler.end_frame()
+        dt = clock.tick(FPS)
 
     pygame.quit()
 
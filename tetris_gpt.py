@@ -2,6 +2,12 @@ import sys
 import random
 import pygame
 
+from latency import latency_from_env
+from profiler import profiler_from_env
+from replay import record_from_env
+from textcache import get_font, render_text
+from timestep import scheduler_from_env
+
 # ----------------------------
 # Configuration
 # ----------------------------
@@ -103,12 +109,247 @@ SPAWN_X, SPAWN_Y = 3, -2
 # Simple wall-kick offsets to try after rotation (subset of SRS-inspired moves)
 KICK_TESTS = [(0,0), (1,0), (-1,0), (0,-1), (2,0), (-2,0)]
 
+# Bottom profile of each rotation state: (dx, lowest dy) per occupied column
+PIECE_BOTTOMS = {
+    letter: [tuple((dx, max(y for x, y in shape if x == dx)) for dx in sorted({x for x, _ in shape}))
+             for shape in states]
+    for letter, states in PIECES.items()
+}
+
+# Zobrist keys: one random 64-bit key per board cell, and per letter for the
+# current and next piece. A board's key is the XOR of the keys of its filled
+# cells (occupancy only, as evaluations ignore colours). Fixed seed, so keys
+# are stable between runs and processes.
+_zobrist_rng = random.Random(0x7E7715)
+ZOBRIST_CELLS = [[_zobrist_rng.getrandbits(64) for _ in range(COLS)] for _ in range(ROWS)]
+ZOBRIST_CURRENT = {letter: _zobrist_rng.getrandbits(64) for letter in PIECES}
+ZOBRIST_NEXT = {letter: _zobrist_rng.getrandbits(64) for letter in PIECES}
+
 # ----------------------------
 # Helper functions
 # ----------------------------
+class GridRow(list):
+    """One row of a Grid: a list of cells that reports writes to its grid.
+
+    grid[y][x] = letter goes through here, so cells written one at a time
+    keep the grid's fill counts, heights, Zobrist key and landing cache
+    current. Rows have a fixed width; y is kept up to date as clears move
+    the row down.
+    """
+
+    def __init__(self, grid, y, cells=None):
+        super().__init__([None] * COLS if cells is None else cells)
+        if len(self) != COLS:
+            raise ValueError(f"grid rows have {COLS} cells, got {len(self)}")
+        self.grid = grid
+        self.y = y
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            cells = list(self)
+            cells[index] = value
+            if len(cells) != COLS:
+                raise ValueError(f"grid rows have {COLS} cells, got {len(cells)}")
+            super().__setitem__(slice(None), cells)
+            self.grid._row_changed(self.y)
+            return
+        old = self[index]
+        super().__setitem__(index, value)
+        self.grid._cell_changed(index % COLS, self.y, old, value)
+
+    def _resize(self, *args, **kwargs):
+        raise TypeError("grid rows have a fixed width")
+
+    __delitem__ = __iadd__ = __imul__ = _resize
+    append = extend = insert = pop = remove = clear = _resize
+
+    def __reduce__(self):
+        # Copied or pickled on its own, a row is a plain list of its cells
+        return list, (list(self),)
+
+
+def _rebuild_grid(cls, rows):
+    # Unpickling/copying target for Grid and BitBoard: a fresh grid, then the rows
+    grid = cls()
+    grid[:] = rows
+    return grid
+
+
+class Grid(list):
+    """List of rows with a version counter, column heights, row fill counts and a landing-row cache.
+
+    The version changes whenever the board does (lock, line clear, a whole
+    row being assigned or a single cell written); cached landing rows are
+    dropped when it moves on. heights[x] is the height of column x's topmost
+    block (0 when empty) and fill[y] the number of blocks in row y;
+    clear_lines only checks the rows changed since the previous clear.
+    zobrist is the board's Zobrist key. Rows are GridRows, so grid[y][x]
+    writes keep all of it current just like lock_piece does. The number of
+    rows is fixed (clear_lines removes rows); reordering them recounts.
+    """
+
+    def __init__(self):
+        super().__init__(GridRow(self, y) for y in range(ROWS))
+        self.version = 0
+        self.heights = [0] * COLS
+        self.fill = [0] * ROWS
+        self.zobrist = 0
+        self._touched = set()
+        self._landing = {}
+        self._landing_version = 0
+
+    def __setitem__(self, index, value):
+        rows = range(ROWS)[index]
+        if isinstance(index, slice):
+            value = [GridRow(self, y, list(row)) for y, row in zip(rows, value)]
+            if len(value) != len(rows):
+                raise ValueError(f"expected {len(rows)} rows, got {len(value)}")
+        else:
+            value = GridRow(self, rows, list(value))
+        super().__setitem__(index, value)
+        for y in (rows if isinstance(index, slice) else [rows]):
+            self.fill[y] = sum(cell is not None for cell in self[y])
+            self._touched.add(y)
+        self.version += 1
+        self.heights = [self._column_height(x, ROWS) for x in range(COLS)]
+        self._rehash()
+
+    def _resize(self, *args, **kwargs):
+        raise TypeError("grid has a fixed number of rows; use clear_lines() to remove full ones")
+
+    __delitem__ = __iadd__ = __imul__ = _resize
+    append = extend = insert = pop = remove = clear = _resize
+
+    def reverse(self):
+        self[:] = [list(row) for row in reversed(self)]
+
+    def sort(self, *, key=None, reverse=False):
+        self[:] = sorted((list(row) for row in self), key=key, reverse=reverse)
+
+    def __reduce__(self):
+        # copy/deepcopy/pickle rebuild from plain rows, so every counter is recomputed
+        return _rebuild_grid, (type(self), [list(row) for row in self])
+
+    def _rehash(self):
+        key = 0
+        for y, row in enumerate(self):
+            if self.fill[y]:
+                cells = ZOBRIST_CELLS[y]
+                for x, cell in enumerate(row):
+                    if cell is not None:
+                        key ^= cells[x]
+        self.zobrist = key
+
+    def _cell_changed(self, x, y, old, new):
+        # A single grid[y][x] write: adjust the counters for that cell only
+        if (old is None) != (new is None):
+            self.fill[y] += 1 if new is not None else -1
+            self.zobrist ^= ZOBRIST_CELLS[y][x]
+            h = ROWS - y
+            if new is not None:
+                if self.heights[x] < h:
+                    self.heights[x] = h
+            elif self.heights[x] == h:
+                self.heights[x] = self._column_height(x, h)
+        self._touched.add(y)
+        self.version += 1
+
+    def _row_changed(self, y):
+        # A slice written into row y: recount it like a whole-row assignment
+        self.fill[y] = sum(cell is not None for cell in self[y])
+        self._touched.add(y)
+        self.version += 1
+        self.heights = [self._column_height(x, ROWS) for x in range(COLS)]
+        self._rehash()
+
+    def _filled(self, x, y):
+        return self[y][x] is not None
+
+    def _row_full(self, y):
+        return self.fill[y] == COLS
+
+    def lock_piece(self, letter, rot, px, py):
+        heights = self.heights
+        fill = self.fill
+        for x, y in piece_blocks(letter, rot, px, py):
+            if 0 <= y < ROWS:
+                row = self[y]
+                if row[x] is None:
+                    fill[y] += 1
+                    self.zobrist ^= ZOBRIST_CELLS[y][x]
+                list.__setitem__(row, x, letter)
+                self._touched.add(y)
+                if heights[x] < ROWS - y:
+                    heights[x] = ROWS - y
+        self.version += 1
+
+    def clear_lines(self):
+        full_rows = [y for y in self._touched if self._row_full(y)]
+        self._touched.clear()
+        if full_rows:
+            self._compact(set(full_rows))
+        return len(full_rows)
+
+    def _compact(self, full):
+        # Drop the full rows and pad with empty ones on top, in one pass
+        keep = [y for y in range(ROWS) if y not in full]
+        list.__setitem__(self, slice(None), [GridRow(self, 0) for _ in full] + [self[y] for y in keep])
+        for y, row in enumerate(self):
+            row.y = y
+        self.fill = [0] * len(full) + [self.fill[y] for y in keep]
+        self.version += 1
+        self._lower_heights(len(full))
+        # Every row above a cleared one moved, so its cells need new keys
+        self._rehash()
+
+    def _column_height(self, x, height):
+        # Highest block of column x at or below the given height
+        while height > 0 and not self._filled(x, ROWS - height):
+            height -= 1
+        return height
+
+    def surface(self):
+        """Height differences between neighbouring columns (the surface profile)."""
+        h = self.heights
+        return [h[x + 1] - h[x] for x in range(COLS - 1)]
+
+    def _lower_heights(self, cleared):
+        # Cleared rows are full, so every column's top block sits at or above them:
+        # the top moves down by `cleared`, or further if the old top was cleared.
+        self.heights = [self._column_height(x, max(0, h - cleared)) for x, h in enumerate(self.heights)]
+
+    def landing_row(self, letter, rot, px):
+        """Row a piece dropped from above the stack rests at, None if px is off the board."""
+        heights = self.heights
+        land = ROWS
+        for dx, bottom in PIECE_BOTTOMS[letter][rot % 4]:
+            x = px + dx
+            if not 0 <= x < COLS:
+                return None
+            land = min(land, ROWS - heights[x] - 1 - bottom)
+        return land
+
+    def ghost_y(self, letter, rot, px, py):
+        if self._landing_version != self.version:
+            self._landing.clear()
+            self._landing_version = self.version
+        key = (letter, rot % 4, px)
+        land = self._landing.get(key, key)
+        if land is key:
+            land = self._landing[key] = self.landing_row(letter, rot, px)
+        # Nothing is above the column tops, so any py at or above land falls to land
+        if land is not None and py <= land:
+            return land
+        return self._scan(letter, rot, px, py)
+
+    def _scan(self, letter, rot, px, py):
+        while valid_position(self, letter, rot, px, py + 1):
+            py += 1
+        return py
+
 def create_grid():
     # 2D grid of None or piece letter
-    return [[None for _ in range(COLS)] for _ in range(ROWS)]
+    return Grid()
 
 def get_piece_shape(letter, rot):
     return PIECES[letter][rot % 4]
@@ -118,7 +359,25 @@ def piece_blocks(letter, rot, px, py):
     for (x, y) in get_piece_shape(letter, rot):
         yield (px + x, py + y)
 
+def zobrist_key(grid, letter=None, next_letter=None):
+    # Key of the board plus (optionally) the current and next piece
+    if isinstance(grid, Grid):
+        key = grid.zobrist
+    else:
+        key = 0
+        for y, row in enumerate(grid):
+            for x, cell in enumerate(row):
+                if cell is not None:
+                    key ^= ZOBRIST_CELLS[y][x]
+    if letter is not None:
+        key ^= ZOBRIST_CURRENT[letter]
+    if next_letter is not None:
+        key ^= ZOBRIST_NEXT[next_letter]
+    return key
+
 def valid_position(grid, letter, rot, px, py):
+    if isinstance(grid, BitBoard):
+        return grid.valid_position(letter, rot, px, py)
     for x, y in piece_blocks(letter, rot, px, py):
         if x < 0 or x >= COLS or y >= ROWS:
             return False
@@ -127,11 +386,16 @@ def valid_position(grid, letter, rot, px, py):
     return True
 
 def lock_piece(grid, letter, rot, px, py):
+    if isinstance(grid, Grid):
+        grid.lock_piece(letter, rot, px, py)
+        return
     for x, y in piece_blocks(letter, rot, px, py):
         if 0 <= y < ROWS:
             grid[y][x] = letter
 
 def clear_lines(grid):
+    if isinstance(grid, Grid):
+        return grid.clear_lines()
     full_rows = [i for i, row in enumerate(grid) if all(cell is not None for cell in row)]
     if not full_rows:
         return 0
@@ -140,22 +404,280 @@ def clear_lines(grid):
         grid.insert(0, [None for _ in range(COLS)])
     return len(full_rows)
 
-def bag_generator():
+# ----------------------------
+# Bitboard engine
+# ----------------------------
+# Optional board backend: every row is also kept as an int bitmask (bit x set
+# when column x is filled), so collision/lock/clear become a few bitwise ops
+# per piece row. The letters stay in the list itself, which keeps grid[y][x]
+# reads (rendering, tests) working exactly as with create_grid().
+FULL_ROW = (1 << COLS) - 1
+
+def _build_row_masks():
+    # ROW_MASKS[letter][rot][x + 3] -> tuple of (dy, mask, xs) per occupied piece row,
+    # or None when the piece would stick out of the left/right walls at that x.
+    table = {}
+    for letter, states in PIECES.items():
+        table[letter] = []
+        for shape in states:
+            per_x = []
+            for px in range(-3, COLS):
+                if any(not 0 <= px + x < COLS for x, _ in shape):
+                    per_x.append(None)
+                    continue
+                rows = {}
+                for x, y in shape:
+                    rows.setdefault(y, []).append(px + x)
+                per_x.append(tuple((dy, sum(1 << c for c in xs), tuple(xs))
+                                   for dy, xs in sorted(rows.items())))
+            table[letter].append(per_x)
+    return table
+
+ROW_MASKS = _build_row_masks()
+
+class BitBoard(Grid):
+    """Drop-in grid backed by per-row bitmasks plus the usual letter rows."""
+
+    def __init__(self):
+        super().__init__()
+        self.masks = [0] * ROWS
+
+    def _cell_changed(self, x, y, old, new):
+        # Mask first: Grid reads it back when it recomputes the height
+        if new is None:
+            self.masks[y] &= ~(1 << x)
+        else:
+            self.masks[y] |= 1 << x
+        super()._cell_changed(x, y, old, new)
+
+    def _row_changed(self, y):
+        self.masks[y] = self._row_mask(self[y])
+        super()._row_changed(y)
+
+    def __setitem__(self, index, value):
+        # Masks first: Grid reads them back when it recomputes the heights
+        if isinstance(index, slice):
+            value = list(value)
+            self.masks[index] = [self._row_mask(row) for row in value]
+        else:
+            self.masks[index] = self._row_mask(value)
+        super().__setitem__(index, value)
+
+    @staticmethod
+    def _row_mask(row):
+        return sum(1 << x for x, cell in enumerate(row) if cell is not None)
+
+    def _filled(self, x, y):
+        return self.masks[y] >> x & 1
+
+    def _row_full(self, y):
+        return self.masks[y] == FULL_ROW
+
+    def valid_position(self, letter, rot, px, py):
+        if not -3 <= px < COLS:
+            return False
+        rows = ROW_MASKS[letter][rot % 4][px + 3]
+        if rows is None:
+            return False
+        masks = self.masks
+        for dy, mask, _ in rows:
+            y = py + dy
+            if y >= ROWS:
+                return False
+            if y >= 0 and masks[y] & mask:
+                return False
+        return True
+
+    def lock_piece(self, letter, rot, px, py):
+        masks = self.masks
+        heights = self.heights
+        fill = self.fill
+        for dy, mask, xs in ROW_MASKS[letter][rot % 4][px + 3]:
+            y = py + dy
+            if 0 <= y < ROWS:
+                new = mask & ~masks[y]
+                fill[y] += bin(new).count('1')
+                cells = ZOBRIST_CELLS[y]
+                while new:
+                    low = new & -new
+                    self.zobrist ^= cells[low.bit_length() - 1]
+                    new ^= low
+                masks[y] |= mask
+                self._touched.add(y)
+                row = self[y]
+                for x in xs:
+                    list.__setitem__(row, x, letter)
+                    if heights[x] < ROWS - y:
+                        heights[x] = ROWS - y
+        self.version += 1
+
+    def _compact(self, full):
+        self.masks = [0] * len(full) + [m for y, m in enumerate(self.masks) if y not in full]
+        super()._compact(full)
+
+def bag_generator(rng=random):
     # 7-bag randomizer
     bag = []
     while True:
         if not bag:
             bag = list(PIECES.keys())
-            random.shuffle(bag)
+            rng.shuffle(bag)
         yield bag.pop()
 
 # ----------------------------
-# Rendering
+# Placement enumeration
 # ----------------------------
-def draw_cell(surface, x, y, color, ghost=False):
-    px = BORDER + x * CELL
-    py = BORDER + y * CELL
-    r = pygame.Rect(px, py, CELL, CELL)
+# Lists every distinct spot the current piece can come to rest, with the
+# step() actions that get it there. The search runs over (rot, x, y) states;
+# instead of probing valid_position it reads a per-board table FREE[rot][x],
+# an int whose bit i is set when the piece fits at y = i + PLACE_MIN_Y.
+# Rotation states that cover the same cells (O, and the I/S/Z pairs) share a
+# shape key, so each resting position is reported once.
+PLACE_MIN_Y = -4                  # highest y the search follows a piece to
+PLACE_NY = ROWS - PLACE_MIN_Y     # y positions per (rot, x)
+PLACE_NX = COLS + 3               # x from -3 to COLS - 1
+
+def _build_shape_keys():
+    # SHAPE_KEYS[letter][rot] -> (shape id, min dx, min dy); equal ids mean equal cells
+    table = {}
+    for letter, states in PIECES.items():
+        keys, seen = [], {}
+        for shape in states:
+            minx = min(x for x, _ in shape)
+            miny = min(y for _, y in shape)
+            cells = frozenset((x - minx, y - miny) for x, y in shape)
+            keys.append((seen.setdefault(cells, len(seen)), minx, miny))
+        table[letter] = keys
+    return table
+
+SHAPE_KEYS = _build_shape_keys()
+
+def _build_place_moves():
+    # PLACE_MOVES[rot * PLACE_NX + x + 3] -> ((action, ((target col, dy), ...)), ...)
+    # with the in-bounds targets of left/right and of each rotation's kicks, in order
+    moves = []
+    for rot in range(4):
+        for xi in range(PLACE_NX):
+            per_col = []
+            for action, dx in (('left', -1), ('right', 1)):
+                if 0 <= xi + dx < PLACE_NX:
+                    per_col.append((action, ((rot * PLACE_NX + xi + dx, 0),)))
+            for action, nr in (('rotate', (rot + 1) % 4), ('rotate_ccw', (rot - 1) % 4)):
+                per_col.append((action, tuple((nr * PLACE_NX + xi + dx, dy) for dx, dy in KICK_TESTS
+                                              if 0 <= xi + dx < PLACE_NX)))
+            moves.append(tuple(per_col))
+    return moves
+
+PLACE_MOVES = _build_place_moves()
+
+def _free_table(masks, letter):
+    # One FREE bitmask per rot * PLACE_NX + (px + 3)
+    # Bit y of cols[x] is set when cell (x, y) is filled; the floor counts as filled
+    cols = [0xF << ROWS] * COLS
+    for y, m in enumerate(masks):
+        while m:
+            low = m & -m
+            x = low.bit_length() - 1
+            cols[x] |= 1 << y
+            m ^= low
+    everything = (1 << PLACE_NY) - 1
+    table = []
+    for per_x in ROW_MASKS[letter]:
+        for rows in per_x:
+            if rows is None:
+                table.append(0)
+                continue
+            blocked = 0
+            for dy, _, xs in rows:
+                filled = 0
+                for x in xs:
+                    filled |= cols[x]
+                shift = PLACE_MIN_Y + dy
+                blocked |= filled >> shift if shift >= 0 else filled << -shift
+            table.append(everything & ~blocked)
+    return table
+
+def enumerate_placements(grid, letter, rot=0, px=SPAWN_X, py=SPAWN_Y, paths=True):
+    """Every distinct resting placement reachable from (rot, px, py).
+
+    Returns dicts {'rot', 'x', 'y', 'path'} in the order they are found, where
+    path is a list of step() actions ending with 'drop' (None with paths=False).
+    grid may also be a list of row bitmasks, as in BitBoard.masks.
+    """
+    if isinstance(grid, BitBoard):
+        masks = grid.masks
+    elif grid and isinstance(grid[0], int):
+        masks = grid
+    else:
+        masks = [BitBoard._row_mask(row) for row in grid]
+    free = _free_table(masks, letter)
+    rot %= 4
+    col, i = rot * PLACE_NX + px + 3, py - PLACE_MIN_Y
+    if not 0 <= i < PLACE_NY or not free[col] >> i & 1:
+        return []
+
+    # The search walks segments: a piece entering column (rot, x) at row i can
+    # soft drop through the whole free run below i, so one node covers it all.
+    # segments[k] = (col, entry row, bottom row, parent k, parent row, action)
+    run = free[col] >> i
+    length = (~run & (run + 1)).bit_length() - 1
+    visited = [0] * len(free)
+    visited[col] = ((1 << length) - 1) << i
+    segments = [(col, i, i + length - 1, None, None, None)]
+    for k, (col, entry, bottom, _, _, _) in enumerate(segments):
+        span = ((1 << (bottom - entry + 1)) - 1) << entry
+        for action, kicks in PLACE_MOVES[col]:
+            # Each row takes the first kick that fits, as in Tetris.rotate
+            remaining = span
+            for target, dy in kicks:
+                fits = free[target]
+                hit = remaining & (fits >> dy if dy >= 0 else fits << -dy)
+                if not hit:
+                    continue
+                remaining &= ~hit
+                new = (hit << dy if dy >= 0 else hit >> -dy) & ~visited[target]
+                while new:
+                    # New segment from the top of each unvisited run
+                    top = (new & -new).bit_length() - 1
+                    run = fits >> top
+                    length = (~run & (run + 1)).bit_length() - 1
+                    visited[target] |= ((1 << length) - 1) << top
+                    segments.append((target, top, top + length - 1, k, top - dy, action))
+                    new &= ~visited[target]
+                if not remaining:
+                    break
+
+    route = [None] * len(segments)
+    route[0] = []
+    keys = SHAPE_KEYS[letter]
+    seen = set()
+    result = []
+    for k, (col, _, bottom, parent, src, action) in enumerate(segments):
+        if k and paths:
+            # Parents always come first
+            route[k] = route[parent] + ['down'] * (src - segments[parent][1]) + [action]
+        r, xi = divmod(col, PLACE_NX)
+        shape, minx, miny = keys[r]
+        key = (shape, xi + minx, bottom + miny)
+        if key in seen:
+            continue
+        seen.add(key)
+        result.append({'rot': r, 'x': xi - 3, 'y': bottom + PLACE_MIN_Y,
+                       'path': route[k] + ['drop'] if paths else None})
+    return result
+
+# ----------------------------
+# Sprite atlas
+# ----------------------------
+# Every cell look (piece colour, ghost variant, checker background) and every
+# preview box is rendered once into a small surface; drawing is then a blit.
+CHECKER_COLORS = ((28, 28, 36), (24, 24, 32))
+PREVIEW_SIZE = (120, 100)
+
+_cell_sprites = {}
+_preview_sprites = {}
+
+def paint_cell(surface, r, color, ghost=False):
     base = color
     if ghost:
         base = tuple(min(255, int(c * 0.45) + 40) for c in color)
@@ -166,21 +688,60 @@ def draw_cell(surface, x, y, color, ghost=False):
     # border
     pygame.draw.rect(surface, (0,0,0), r, 1)
 
+def _new_sprite(size):
+    sprite = pygame.Surface(size)
+    # Match the display format when there is one, so blits need no conversion
+    return sprite.convert() if pygame.display.get_surface() is not None else sprite
+
+def cell_sprite(color, ghost=False):
+    sprite = _cell_sprites.get((color, ghost))
+    if sprite is None:
+        sprite = _new_sprite((CELL, CELL))
+        paint_cell(sprite, sprite.get_rect(), color, ghost)
+        _cell_sprites[color, ghost] = sprite
+    return sprite
+
+def preview_sprite(letter):
+    sprite = _preview_sprites.get(letter)
+    if sprite is None:
+        sprite = _new_sprite(PREVIEW_SIZE)
+        sprite.fill(BLACK)
+        paint_preview(sprite, letter, 0, 0)
+        _preview_sprites[letter] = sprite
+    return sprite
+
+def build_atlas():
+    # Call after pygame.display.set_mode so sprites use the display format
+    _cell_sprites.clear()
+    _preview_sprites.clear()
+    for letter, color in COLORS.items():
+        cell_sprite(color)
+        if letter is not None:
+            cell_sprite(color, ghost=True)
+        preview_sprite(letter)
+    for color in CHECKER_COLORS:
+        cell_sprite(color)
+
+# ----------------------------
+# Rendering
+# ----------------------------
+def draw_cell(surface, x, y, color, ghost=False):
+    surface.blit(cell_sprite(color, ghost), (BORDER + x * CELL, BORDER + y * CELL))
+
 def draw_grid(surface, grid):
     # background
     play_rect = pygame.Rect(BORDER, BORDER, PLAY_W, PLAY_H)
     pygame.draw.rect(surface, GRAY, play_rect, border_radius=8)
+    cells = []
     for y in range(ROWS):
         for x in range(COLS):
             c = grid[y][x]
             color = COLORS[c] if c in COLORS else COLORS[None]
             if c is None:
                 # subtle checker
-                if (x + y) % 2 == 0:
-                    color = (28, 28, 36)
-                else:
-                    color = (24, 24, 32)
-            draw_cell(surface, x, y, color)
+                color = CHECKER_COLORS[(x + y) % 2]
+            cells.append((cell_sprite(color), (BORDER + x * CELL, BORDER + y * CELL)))
+    surface.blits(cells, doreturn=False)
 
 def draw_current(surface, letter, rot, px, py):
     for x, y in piece_blocks(letter, rot, px, py):
@@ -188,6 +749,8 @@ def draw_current(surface, letter, rot, px, py):
             draw_cell(surface, x, y, COLORS[letter])
 
 def compute_ghost_y(grid, letter, rot, px, py):
+    if isinstance(grid, Grid):
+        return grid.ghost_y(letter, rot, px, py)
     gy = py
     while valid_position(grid, letter, rot, px, gy + 1):
         gy += 1
@@ -199,46 +762,100 @@ def draw_ghost(surface, grid, letter, rot, px, py):
         if y >= 0:
             draw_cell(surface, x, y, COLORS[letter], ghost=True)
 
+class GridRenderer:
+    """Dirty-rectangle playfield renderer.
+
+    Remembers how every cell looked on the last frame (locked, ghost and
+    current-piece cells included) and redraws only the cells that changed,
+    returning their rects for pygame.display.update.
+    """
+    def __init__(self, surface):
+        self.surface = surface
+        self.drawn = None
+
+    def invalidate(self):
+        # Force a full redraw on the next render (e.g. after an overlay)
+        self.drawn = None
+
+    def render(self, grid, current=None):
+        checker = CHECKER_COLORS
+        empty = COLORS[None]
+        looks = [[(checker[(x + y) % 2] if c is None else COLORS.get(c, empty), False)
+                  for x, c in enumerate(row)] for y, row in enumerate(grid)]
+        if current is not None:
+            letter, rot, px, py = current['letter'], current['rot'], current['x'], current['y']
+            color = COLORS[letter]
+            gy = compute_ghost_y(grid, letter, rot, px, py)
+            for x, y in piece_blocks(letter, rot, px, gy):
+                if y >= 0:
+                    looks[y][x] = (color, True)
+            for x, y in piece_blocks(letter, rot, px, py):
+                if y >= 0:
+                    looks[y][x] = (color, False)
+
+        drawn = self.drawn
+        self.drawn = looks
+        if drawn is None:
+            play_rect = pygame.Rect(BORDER, BORDER, PLAY_W, PLAY_H)
+            pygame.draw.rect(self.surface, GRAY, play_rect, border_radius=8)
+            self.surface.blits([(cell_sprite(color, ghost), (BORDER + x * CELL, BORDER + y * CELL))
+                                for y, row in enumerate(looks)
+                                for x, (color, ghost) in enumerate(row)], doreturn=False)
+            return [play_rect]
+
+        dirty = []
+        for y, (row, old) in enumerate(zip(looks, drawn)):
+            if row == old:
+                continue
+            for x, look in enumerate(row):
+                if look != old[x]:
+                    draw_cell(self.surface, x, y, look[0], look[1])
+                    dirty.append(pygame.Rect(BORDER + x * CELL, BORDER + y * CELL, CELL, CELL))
+        return dirty
+
 def draw_hud(surface, score, level, lines, next_piece, held_piece, paused, game_over):
-    font = pygame.font.SysFont("consolas", 20)
-    big = pygame.font.SysFont("consolas", 32, bold=True)
+    font = get_font("consolas", 20)
+    big = get_font("consolas", 32, bold=True)
 
     # Right panel
     panel_x = BORDER + PLAY_W + 12
     # Title
-    title = big.render("TETRIS", True, WHITE)
+    title = render_text(big, "TETRIS", WHITE)
     surface.blit(title, (panel_x, BORDER))
 
     # Score/Level/Lines
     y = BORDER + 50
     for label, value in [("SCORE", score), ("LEVEL", level), ("LINES", lines)]:
-        txt = font.render(f"{label}: {value}", True, WHITE)
+        txt = render_text(font, f"{label}: {value}", WHITE)
         surface.blit(txt, (panel_x, y))
         y += 24
 
     # Next piece preview
     y += 10
-    surface.blit(font.render("NEXT", True, WHITE), (panel_x, y))
+    surface.blit(render_text(font, "NEXT", WHITE), (panel_x, y))
     y += 8
     draw_preview(surface, next_piece, panel_x, y)
     y += 110
 
     # Hold (not used here for gameplay fairness; we can display None)
-    surface.blit(font.render("HOLD", True, WHITE), (panel_x, y))
+    surface.blit(render_text(font, "HOLD", WHITE), (panel_x, y))
     y += 8
     draw_preview(surface, held_piece, panel_x, y)
 
     # Pause / Game over overlays
     if paused:
-        overlay = big.render("PAUSED", True, WHITE)
+        overlay = render_text(big, "PAUSED", WHITE)
         surface.blit(overlay, (BORDER + 20, HEIGHT // 2 - 20))
     if game_over:
-        overlay = big.render("GAME OVER", True, WHITE)
+        overlay = render_text(big, "GAME OVER", WHITE)
         surface.blit(overlay, (BORDER + 10, HEIGHT // 2 - 20))
-        surface.blit(font.render("Press R to restart", True, WHITE), (BORDER + 14, HEIGHT // 2 + 16))
+        surface.blit(render_text(font, "Press R to restart", WHITE), (BORDER + 14, HEIGHT // 2 + 16))
 
 def draw_preview(surface, letter, ox, oy):
-    box = pygame.Rect(ox, oy, 120, 100)
+    surface.blit(preview_sprite(letter), (ox, oy))
+
+def paint_preview(surface, letter, ox, oy):
+    box = pygame.Rect(ox, oy, *PREVIEW_SIZE)
     pygame.draw.rect(surface, LIGHT_GRAY, box, border_radius=8)
     pygame.draw.rect(surface, (0,0,0), box, 1)
     if not letter:
@@ -266,15 +883,21 @@ def draw_preview(surface, letter, ox, oy):
 # Game class
 # ----------------------------
 class Tetris:
-    def __init__(self):
-        self.grid = create_grid()
+    def __init__(self, bitboard=False, seed=None):
+        self.bitboard = bitboard
+        # Each game owns its RNG; the seed is kept so the game can be replayed
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.recording = None  # replay.Recording when inputs are being logged
+        self.grid = BitBoard() if bitboard else create_grid()
         self.score = 0
         self.lines = 0
+        self.pieces = 0  # locked pieces, for benchmarks
         self.level = 1
         self.drop_interval = 0.9  # seconds per soft drop tick initially
         self.drop_timer = 0.0
 
-        self.piece_gen = bag_generator()
+        self.piece_gen = bag_generator(self.rng)
         self.current = None
         self.spawn_new_piece()
 
@@ -325,7 +948,7 @@ class Tetris:
                 return
         # If none valid, no rotation
 
-    def move(self, dx):
+    def shift(self, dx):
         if self.game_over or self.paused:
             return
         px, py = self.current['x'], self.current['y']
@@ -341,6 +964,7 @@ class Tetris:
         else:
             # Lock piece
             lock_piece(self.grid, self.current['letter'], self.current['rot'], px, py)
+            self.pieces += 1
             # Clear lines
             cleared = clear_lines(self.grid)
             if cleared > 0:
@@ -367,12 +991,73 @@ class Tetris:
         # Lock immediately
         self.drop_one()
 
+    def zobrist_key(self):
+        # Board + current + next piece, for transposition tables
+        return zobrist_key(self.grid, self.current['letter'], self.next_piece)
+
+    def placements(self):
+        # Resting placements of the current piece, each with the step() actions from here
+        c = self.current
+        if self.game_over:
+            return []
+        return enumerate_placements(self.grid, c['letter'], c['rot'], c['x'], c['y'])
+
+    def step(self, action):
+        # Programmatic input for headless play (no display/fonts needed).
+        # 'hold_*'/'release_*' and 'soft_drop_*' mirror held keys in main().
+        # Returns False once the game is over.
+        if self.recording is not None:
+            self.recording.add_input(action)
+        if action == 'left':
+            self.shift(-1)
+        elif action == 'right':
+            self.shift(1)
+        elif action == 'rotate':
+            self.rotate(cw=True)
+        elif action == 'rotate_ccw':
+            self.rotate(cw=False)
+        elif action == 'down':
+            if not (self.game_over or self.paused):
+                self.drop_one()
+        elif action == 'drop':
+            self.hard_drop()
+        elif action in ('hold_left', 'hold_right'):
+            if not self.game_over:
+                self.move_dir = -1 if action == 'hold_left' else 1
+                self.move_initial_delay_done = False
+                self.move_timer = 0.0
+                self.shift(self.move_dir)
+        elif action in ('release_left', 'release_right'):
+            if self.move_dir == (-1 if action == 'release_left' else 1):
+                self.move_dir = 0
+                self.move_timer = 0.0
+                self.move_initial_delay_done = False
+        elif action in ('soft_drop_on', 'soft_drop_off'):
+            if action == 'soft_drop_off' or not self.game_over:
+                self.soft_drop = action == 'soft_drop_on'
+        elif action == 'pause':
+            self.toggle_pause()
+        elif action == 'restart':
+            self.restart()
+        else:
+            raise ValueError(f"Unknown action: {action}")
+        return not self.game_over
+
+    def tick(self, dt_ms):
+        # Advance game time by dt_ms milliseconds (gravity, DAS)
+        if self.recording is not None:
+            self.recording.add_frame(dt_ms)
+        self.update(dt_ms / 1000.0)
+
     def toggle_pause(self):
         if not self.game_over:
             self.paused = not self.paused
 
     def restart(self):
-        self.__init__()
+        # Next game's seed comes from this game's RNG, so restarts replay too
+        recording = self.recording
+        self.__init__(bitboard=self.bitboard, seed=self.rng.randrange(2 ** 32))
+        self.recording = recording
 
     def update(self, dt):
         if self.game_over or self.paused:
@@ -393,12 +1078,12 @@ class Tetris:
             self.move_timer += dt
             if not self.move_initial_delay_done:
                 if self.move_timer >= self.move_repeat_delay:
-                    self.move(px_dir=self.move_dir)
+                    self.shift(self.move_dir)
                     self.move_timer -= self.move_repeat_delay
                     self.move_initial_delay_done = True
             else:
                 while self.move_timer >= self.move_repeat_rate:
-                    self.move(px_dir=self.move_dir)
+                    self.shift(self.move_dir)
                     self.move_timer -= self.move_repeat_rate
 
     def move(self, px_dir):
@@ -411,20 +1096,47 @@ class Tetris:
 # ----------------------------
 # Main loop
 # ----------------------------
+KEYDOWN_ACTIONS = {
+    pygame.K_p: 'pause',
+    pygame.K_r: 'restart',
+    pygame.K_LEFT: 'hold_left',
+    pygame.K_RIGHT: 'hold_right',
+    pygame.K_DOWN: 'soft_drop_on',
+    pygame.K_UP: 'rotate',
+    pygame.K_x: 'rotate',
+    pygame.K_z: 'rotate_ccw',
+    pygame.K_SPACE: 'drop',
+}
+KEYUP_ACTIONS = {
+    pygame.K_LEFT: 'release_left',
+    pygame.K_RIGHT: 'release_right',
+    pygame.K_DOWN: 'soft_drop_off',
+}
+
 def main():
     pygame.init()
     # Adjust window width to include side panel
     panel_w = 150
     window = pygame.display.set_mode((BORDER + PLAY_W + panel_w, BORDER + PLAY_H))
     pygame.display.set_caption("Tetris - pygame")
+    build_atlas()
     clock = pygame.time.Clock()
-    font = pygame.font.SysFont("consolas", 18)
+    font = get_font("consolas", 18)
+    renderer = GridRenderer(window)
+    panel_rect = pygame.Rect(BORDER + PLAY_W, 0, window.get_width() - BORDER - PLAY_W, window.get_height())
+    hud_state = None
 
-    game = Tetris()
+    game = record_from_env(Tetris(), 'gpt')
+    scheduler = scheduler_from_env()
+    probe = latency_from_env('gpt')
+    profiler = profiler_from_env('gpt')
+    graph_rect = pygame.Rect(panel_rect.x + 12, panel_rect.bottom - 100, 126, 80)
 
     running = True
     while running:
-        dt = clock.tick(FPS) / 1000.0
+        dt_ms = clock.tick(FPS)
+        if profiler:
+            profiler.start()
 
         # Events
         for event in pygame.event.get():
@@ -434,61 +1146,61 @@ def main():
             elif event.type == pygame.KEYDOWN:
                 if event.key in (pygame.K_ESCAPE,):
                     running = False
-                elif event.key == pygame.K_p:
-                    game.toggle_pause()
-                elif event.key == pygame.K_r:
-                    game.restart()
-                if game.game_over:
-                    continue
-                if event.key == pygame.K_LEFT:
-                    game.move_dir = -1
-                    game.move_initial_delay_done = False
-                    game.move_timer = 0.0
-                    game.move(-1)
-                elif event.key == pygame.K_RIGHT:
-                    game.move_dir = 1
-                    game.move_initial_delay_done = False
-                    game.move_timer = 0.0
-                    game.move(1)
-                elif event.key == pygame.K_DOWN:
-                    game.soft_drop = True
-                elif event.key in (pygame.K_UP, pygame.K_x):
-                    game.rotate(cw=True)
-                elif event.key == pygame.K_z:
-                    game.rotate(cw=False)
-                elif event.key == pygame.K_SPACE:
-                    game.hard_drop()
+                elif event.key in KEYDOWN_ACTIONS:
+                    if probe:
+                        probe.key_down()
+                    game.step(KEYDOWN_ACTIONS[event.key])
+                    if probe:
+                        probe.applied()
 
             elif event.type == pygame.KEYUP:
-                if event.key in (pygame.K_LEFT, pygame.K_RIGHT):
-                    if (event.key == pygame.K_LEFT and game.move_dir == -1) or (event.key == pygame.K_RIGHT and game.move_dir == 1):
-                        game.move_dir = 0
-                        game.move_timer = 0.0
-                        game.move_initial_delay_done = False
-                elif event.key == pygame.K_DOWN:
-                    game.soft_drop = False
-
-        # Update
-        game.update(dt)
-
-        # Render
-        window.fill(BLACK)
-        draw_grid(window, game.grid)
-        if not game.game_over:
-            draw_ghost(window, game.grid, game.current['letter'], game.current['rot'], game.current['x'], game.current['y'])
-            draw_current(window, game.current['letter'], game.current['rot'], game.current['x'], game.current['y'])
-        else:
-            # Show final position locked already by game-over detection (no current piece)
-            pass
+                if event.key in KEYUP_ACTIONS:
+                    game.step(KEYUP_ACTIONS[event.key])
+
+        if profiler:
+            profiler.mark('event')
+
+        # Update: fixed steps, independent of the frame rate
+        scheduler.run(dt_ms, game.tick)
+        if profiler:
+            profiler.mark('update')
+
+        # Render: only cells and HUD values that changed since the last frame
+        new_hud = (game.score, game.level, game.lines, game.next_piece, game.held_piece, game.paused, game.game_over)
+        full = hud_state is None or new_hud[-2:] != hud_state[-2:]
+        if full:
+            # Pause/game-over overlays cover the playfield: repaint everything
+            window.fill(BLACK)
+            renderer.invalidate()
+
+        # Show final position locked already by game-over detection (no current piece)
+        dirty = renderer.render(game.grid, None if game.game_over else game.current)
 
         # HUD
-        draw_hud(window, game.score, game.level, game.lines, game.next_piece, game.held_piece, game.paused, game.game_over)
+        if new_hud != hud_state:
+            if not full:
+                window.fill(BLACK, panel_rect)
+            draw_hud(window, *new_hud)
+            dirty.append(panel_rect)
+            hud_state = new_hud
 
-        # Controls hint
-        hint = font.render("Arrows: Move/Soft Drop | Up/X: Rotate | Space: Hard Drop | P: Pause | R: Restart", True, WHITE)
-        window.blit(hint, (BORDER, HEIGHT - 24))
+        if profiler and profiler.overlay:
+            dirty.append(profiler.draw_overlay(window, graph_rect))
+        if profiler:
+            profiler.mark('render')
 
-        pygame.display.flip()
+        if full:
+            # Controls hint
+            hint = render_text(font, "Arrows: Move/Soft Drop | Up/X: Rotate | Space: Hard Drop | P: Pause | R: Restart", WHITE)
+            window.blit(hint, (BORDER, HEIGHT - 24))
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+        if probe:
+            probe.flipped()
+        if profiler:
+            profiler.mark('flip')
+            profiler.end_frame()
 
     pygame.quit()
     sys.exit()
@@ -0,0 +1,47 @@
+from collections import OrderedDict
+
+import pygame
+
+# ----------------------------
+# Font and text-surface cache
+# ----------------------------
+# Fonts are created once per (name, size, bold). Rendered text surfaces live in
+# an LRU keyed by (font, text, colour, antialias), so static labels rasterise
+# once and values such as the score only re-render when they change.
+
+TEXT_CACHE_SIZE = 256
+
+_fonts = {}
+_texts = OrderedDict()
+
+
+def get_font(name, size, bold=False):
+    """Font for name (None is pygame's default font, anything else a system font)."""
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        if name is None:
+            font = pygame.font.Font(None, size)
+            font.set_bold(bold)
+        else:
+            font = pygame.font.SysFont(name, size, bold=bold)
+        _fonts[key] = font
+    return font
+
+
+def render_text(font, text, color, antialias=True):
+    key = (font, text, color, antialias)
+    surface = _texts.get(key)
+    if surface is None:
+        surface = font.render(text, antialias, color)
+        _texts[key] = surface
+        if len(_texts) > TEXT_CACHE_SIZE:
+            _texts.popitem(last=False)
+    else:
+        _texts.move_to_end(key)
+    return surface
+
+
+def clear():
+    _fonts.clear()
+    _texts.clear()
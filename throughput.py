@@ -0,0 +1,96 @@
+import argparse
+import random
+import time
+
+from headless import MODELS, new_game
+from selfplay import POLICIES
+
+# ----------------------------
+# Runtime throughput metrics
+# ----------------------------
+# Runs each model's Tetris class through the same seeded self-play workload
+# and reports how fast the generated code runs: actions/sec, locks/sec, mean
+# cost of one clear_lines call and wall time per simulated game. clear_lines
+# is timed through a per-instance wrapper, so the engine code is untouched.
+
+GAMES = 20
+MAX_ACTIONS = 2000
+POLICY = 'random'
+
+
+def _clear_owner(model, game):
+    # tetris_gpt clears through its Grid; the other two through Tetris itself
+    return game.grid if model == 'gpt' else game
+
+
+def _time_clears(owner, timings):
+    clear = owner.clear_lines
+
+    def timed(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return clear(*args, **kwargs)
+        finally:
+            timings.append(time.perf_counter_ns() - start)
+    owner.clear_lines = timed
+
+
+def measure_throughput(model, games=GAMES, seed=0, policy=POLICY, max_actions=MAX_ACTIONS):
+    """Play games seeded seed..seed+games-1; returns the throughput metrics."""
+    actions = pieces = 0
+    clears = []
+    elapsed = 0.0
+    for s in range(seed, seed + games):
+        game = new_game(model, s)
+        _time_clears(_clear_owner(model, game), clears)
+        choose = POLICIES[policy](random.Random(s))
+        start = time.perf_counter()
+        n = 0
+        while n < max_actions and game.step(choose(game)):
+            n += 1
+        elapsed += time.perf_counter() - start
+        actions += n
+        pieces += game.pieces
+    return {
+        'model': model,
+        'games': games,
+        'actions': actions,
+        'locks': pieces,
+        'seconds': elapsed,
+        'actions_per_sec': actions / elapsed if elapsed else 0.0,
+        'locks_per_sec': pieces / elapsed if elapsed else 0.0,
+        'clear_lines_calls': len(clears),
+        'clear_lines_mean_us': sum(clears) / len(clears) / 1000 if clears else 0.0,
+        'ms_per_game': elapsed / games * 1000 if games else 0.0,
+    }
+
+
+def format_throughput(stats):
+    """Report lines in the analisis scripts' '  - label : value' layout."""
+    return [
+        f"  - Actions/sec               : {stats['actions_per_sec']:.0f}",
+        f"  - Locks/sec                 : {stats['locks_per_sec']:.0f}",
+        f"  - Mean clear_lines cost     : {stats['clear_lines_mean_us']:.2f} us",
+        f"  - Time per game             : {stats['ms_per_game']:.2f} ms",
+    ]
+
+
+def print_throughput(model, games=GAMES):
+    stats = measure_throughput(model, games)
+    print(f"[{model}] RUNTIME THROUGHPUT ({stats['games']} seeded games, {POLICY} policy)")
+    for line in format_throughput(stats):
+        print(line)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runtime throughput of each model's Tetris class")
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), default=list(MODELS))
+    parser.add_argument('--games', type=int, default=GAMES)
+    args = parser.parse_args()
+    for model in args.models:
+        print_throughput(model, args.games)
+
+
+if __name__ == "__main__":
+    main()
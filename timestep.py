@@ -0,0 +1,50 @@
+import os
+
+# ----------------------------
+# Fixed-timestep scheduler
+# ----------------------------
+# Decouples game time from frame rate. The main loop samples input and renders
+# once per frame, feeds the frame's real duration in here, and gets back how
+# many fixed simulation steps to run. Steps are whole milliseconds so that a
+# recorded game (one dt per tick) replays exactly.
+
+SIM_HZ = 100        # simulation steps per second
+MAX_STEPS = 8       # catch-up cap per frame; time beyond it is dropped
+SIM_HZ_ENV = 'TETRIS_SIM_HZ'
+
+
+class FixedTimestep:
+    def __init__(self, hz=SIM_HZ, max_steps=MAX_STEPS):
+        if hz <= 0 or max_steps < 1:
+            raise ValueError("hz must be positive and max_steps at least 1")
+        self.step_ms = max(1, round(1000 / hz))
+        self.max_steps = max_steps
+        self.accumulator = 0
+        self.dropped_ms = 0  # time skipped by the catch-up cap (stalls, window drags)
+
+    def advance(self, frame_ms):
+        """Add a frame's duration and return the number of steps to simulate."""
+        self.accumulator += frame_ms
+        steps = self.accumulator // self.step_ms
+        if steps > self.max_steps:
+            self.dropped_ms += (steps - self.max_steps) * self.step_ms
+            steps = self.max_steps
+        self.accumulator %= self.step_ms
+        return steps
+
+    @property
+    def alpha(self):
+        """Fraction of a step left in the accumulator, for render interpolation."""
+        return self.accumulator / self.step_ms
+
+    def run(self, frame_ms, tick):
+        """Advance by frame_ms, calling tick(step_ms) once per step; returns the step count."""
+        steps = self.advance(frame_ms)
+        for _ in range(steps):
+            tick(self.step_ms)
+        return steps
+
+
+def scheduler_from_env():
+    """FixedTimestep at TETRIS_SIM_HZ steps per second (SIM_HZ when unset)."""
+    return FixedTimestep(float(os.environ.get(SIM_HZ_ENV, SIM_HZ)))